@@ -12,27 +12,80 @@ DUAL-PASS DETECTION:
 - Rejects detections that return "No costume" (filters out actual cars/objects)
 """
 
+import argparse
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import cv2
+import numpy as np
 from dotenv import load_dotenv
-from ultralytics import YOLO
 
 from backend.src.clients.baseten_client import BasetenClient
 from backend.src.clients.supabase_client import SupabaseClient
 from backend.src.costume_detector import (
-    INFLATABLE_CLASSES,
-    PERSON_CLASS,
-    detect_people_and_costumes,
+    DETECTION_CLASSES,
+    JPEG_PARAMS,
+    encode_crop,
+    split_detections,
+    validate_inflatables,
 )
-from backend.src.utils.face_blur import FaceBlurrer
+from backend.src.detection.frame_reader import FrameReader
+from backend.src.detection.motion_gate import BackgroundSubtractorGate, MotionGate
+from backend.src.detection.roi_filter import filter_boxes, roi_to_pixels, warmup
+from backend.src.detection.rtsp_stream import build_rtsp_url, connect_to_stream
+from backend.src.detection.yolo_model import (
+    detect_boxes_batch,
+    export_onnx_int8,
+    export_tensorrt_engine,
+    imgsz_for_width,
+    load_yolo_model,
+    set_inference_threads,
+    warmup_model,
+)
+from backend.src.utils.face_blur import pixelate
+
+# Command line options
+parser = argparse.ArgumentParser(description="Person detection on DoorBird RTSP stream")
+parser.add_argument(
+    "--export-engine",
+    action="store_true",
+    help="Export the YOLO TensorRT engine (requires an NVIDIA GPU) and exit",
+)
+parser.add_argument(
+    "--export-onnx-int8",
+    action="store_true",
+    help=(
+        "Calibrate and export an INT8 ONNX model on frames from the DoorBird "
+        "stream and exit"
+    ),
+)
+args = parser.parse_args()
 
 # Load environment variables
 load_dotenv()
 
+# Use an INT8-calibrated TensorRT engine instead of FP16 (NVIDIA GPUs only)
+YOLO_INT8 = os.getenv("YOLO_INT8", "").lower() in ("1", "true", "yes")
+
+# YOLO input width (height follows for 16:9); smaller is faster, 320 or 160
+# still finds people at the doorstep. Re-export engines/models after changing.
+YOLO_IMGSZ = imgsz_for_width(int(os.getenv("YOLO_IMGSZ", "640")))
+
+# CPU threads for YOLO inference (OpenCV is pinned to one thread)
+YOLO_THREADS = int(os.getenv("YOLO_THREADS", "2"))
+
+if args.export_engine:
+    print(f"⚙️  Exporting YOLOv8n TensorRT {'INT8' if YOLO_INT8 else 'FP16'} engine...")
+    engine_path = export_tensorrt_engine(imgsz=YOLO_IMGSZ, int8=YOLO_INT8)
+    print(f"✅ Engine exported: {engine_path}")
+    exit(0)
+
+# Timezone for detection timestamps (loaded once)
+LA_TZ = ZoneInfo("America/Los_Angeles")
+
 # DoorBird connection details
 DOORBIRD_USER = os.getenv("DOORBIRD_USERNAME")
 DOORBIRD_PASSWORD = os.getenv("DOORBIRD_PASSWORD")
@@ -45,15 +98,59 @@ if not all([DOORBIRD_USER, DOORBIRD_PASSWORD, DOORBIRD_IP]):
     exit(1)
 
 # Construct RTSP URL
-rtsp_url = f"rtsp://{DOORBIRD_USER}:{DOORBIRD_PASSWORD}@{DOORBIRD_IP}/mpeg/media.amp"
+rtsp_url = build_rtsp_url(DOORBIRD_USER, DOORBIRD_PASSWORD, DOORBIRD_IP)
+
+# Optional GStreamer hardware H.264 decoder (e.g. nvv4l2decoder on Jetson,
+# vaapih264dec on Intel, avdec_h264 for software). Unset = OpenCV's FFmpeg backend.
+RTSP_GST_DECODER = os.getenv("RTSP_GST_DECODER")
+
+if args.export_onnx_int8:
+    # Calibrate on the real doorstep scene: 100 frames, one every 10 frames
+    print("⚙️  Capturing calibration frames from DoorBird...")
+    calibration_cap = connect_to_stream(rtsp_url, RTSP_GST_DECODER)
+    calibration_frames = []
+    frames_seen = 0
+    while len(calibration_frames) < 100:
+        ret, frame = calibration_cap.read()
+        if not ret:
+            print("❌ ERROR: Could not read frames from DoorBird RTSP stream")
+            exit(1)
+        if frames_seen % 10 == 0:
+            calibration_frames.append(frame)
+        frames_seen += 1
+    calibration_cap.release()
+
+    print("⚙️  Exporting YOLOv8n INT8 ONNX model...")
+    onnx_path = export_onnx_int8(calibration_frames, imgsz=YOLO_IMGSZ)
+    print(f"✅ Model exported: {onnx_path}")
+    exit(0)
+
+# Also keep a local JPEG of every detection (always on without Supabase)
+SAVE_LOCAL = os.getenv("SAVE_LOCAL", "").lower() in ("1", "true", "yes")
+
+# Motion gate in front of YOLO: "absdiff" (thumbnail difference) or "mog2"
+# (background model, adapts to lighting changes on its own)
+MOTION_GATE = os.getenv("MOTION_GATE", "absdiff").lower()
 
 print("🚀 Starting person detection system...")
 print(f"📹 Connecting to DoorBird at {DOORBIRD_IP}")
+if RTSP_GST_DECODER:
+    print(f"🎞️  Decoding with GStreamer ({RTSP_GST_DECODER})")
+
+INFERENCE_INTERVAL = 1.0  # Seconds between YOLO runs (~1 per second)
+BATCH_SIZE = 4  # Frames sampled per YOLO run (one batched call per interval)
+SAMPLE_INTERVAL = INFERENCE_INTERVAL / BATCH_SIZE
 
 # Load YOLOv8n model (smallest/fastest)
-print("🤖 Loading YOLOv8n model...")
-model = YOLO("yolov8n.pt")  # Will download on first run (~6MB)
-print("✅ Model loaded!")
+# Uses a TensorRT FP16 (or INT8 with YOLO_INT8=1) engine on NVIDIA GPUs,
+# OpenVINO INT8 or DeepSparse on CPU (if installed), PyTorch weights otherwise
+print(f"🤖 Loading YOLOv8n model ({YOLO_IMGSZ[1]}x{YOLO_IMGSZ[0]} input)...")
+set_inference_threads(YOLO_THREADS)
+model = load_yolo_model(imgsz=YOLO_IMGSZ, int8=YOLO_INT8)
+# Pay one-time init costs before the stream opens, at the batch size the
+# detection loop runs
+warmup_model(model, batch=BATCH_SIZE)
+print(f"✅ Model loaded! (Backend: {model.backend})")
 
 # Initialize Supabase client (optional - graceful degradation if not configured)
 supabase_client = None
@@ -73,9 +170,170 @@ except Exception as e:
     print(f"⚠️  Baseten not configured: {e}")
     print("   Costume classification will be skipped")
 
-# Initialize face blurrer for privacy protection
-face_blurrer = FaceBlurrer(blur_strength=51)
-print("✅ Face blurrer initialized (privacy protection enabled)")
+# Background pools for network-bound work: inflatable validation and Baseten
+# classification (one task per captured frame) and Supabase uploads (one task
+# per person)
+io_pool = ThreadPoolExecutor(max_workers=4)
+upload_pool = ThreadPoolExecutor(max_workers=4)
+
+
+def upload_detection(person, frame_jpeg, detection_timestamp):
+    """Upload one detection to Supabase (if configured). Runs on io_pool."""
+    if supabase_client:
+        try:
+            supabase_client.save_detection(
+                image_path=None,
+                image_bytes=frame_jpeg,
+                timestamp=detection_timestamp,
+                confidence=person["confidence"],
+                bounding_box=person["bounding_box"],
+                costume_classification=person.get("costume_classification"),
+                costume_description=person.get("costume_description"),
+                costume_confidence=person.get("costume_confidence"),
+            )
+        except Exception as e:
+            print(f"   ⚠️  Supabase upload failed: {e}")
+
+
+def classify_and_upload(people, person_crops, frame_jpeg, detection_timestamp):
+    """
+    Classify costumes for a frame's people in one Baseten request, then upload
+    each detection. Runs on io_pool.
+
+    person_crops holds the unblurred crop for each person that still needs
+    classification, and None for people already classified during inflatable
+    validation (or when Baseten is not configured).
+    """
+    to_classify = [
+        (person, crop)
+        for person, crop in zip(people, person_crops, strict=True)
+        if crop is not None
+    ]
+    for person in people:
+        if person.get("costume_classification"):
+            classification = person["costume_classification"]
+            print(f"   ✓ Costume already classified: {classification}")
+
+    if to_classify:
+        # Classify costume using Baseten (using original unblurred crops)
+        try:
+            print(f"   🎭 Classifying {len(to_classify)} costume(s)...")
+            # Encode images to bytes (size-dependent quality, no optimize pass)
+            classifications = baseten_client.classify_costumes(
+                [encode_crop(crop) for _, crop in to_classify]
+            )
+        except Exception as e:
+            print(f"   ⚠️  Costume classification failed: {e}")
+            classifications = [(None, None, None)] * len(to_classify)
+
+        for (person, _), classification in zip(
+            to_classify, classifications, strict=True
+        ):
+            (
+                costume_classification,
+                costume_confidence,
+                costume_description,
+            ) = classification
+            if costume_classification:
+                print(
+                    f"   👗 Costume: {costume_classification} "
+                    f"({costume_confidence:.2f})"
+                )
+                print(f"      {costume_description}")
+            else:
+                print("   ⚠️  Could not classify costume")
+
+            # Store classification results for the upload
+            person["costume_classification"] = costume_classification
+            person["costume_description"] = costume_description
+            person["costume_confidence"] = costume_confidence
+
+    # Upload every detection in parallel
+    for person in people:
+        upload_pool.submit(upload_detection, person, frame_jpeg, detection_timestamp)
+
+
+def process_capture(
+    frame,
+    blurred_frame,
+    people,
+    potential_inflatables,
+    detection_count,
+    detection_timestamp,
+    filename,
+):
+    """
+    Finish a capture off the detection loop. Runs on io_pool.
+
+    Validates the potential inflatables with Baseten (PASS 2), draws the boxes
+    of every kept detection on the already blurred frame, encodes and saves
+    it, then classifies and uploads the detections. frame is the unblurred
+    capture; neither frame is modified by the loop after submission.
+    """
+    detected_people = list(people)
+    if baseten_client and potential_inflatables:
+        detected_people.extend(
+            validate_inflatables(
+                frame, potential_inflatables, baseten_client, verbose=True
+            )
+        )
+
+    num_people = len(detected_people)
+    print(f"👤 {num_people} person(s) detected! (Detection #{detection_count})")
+
+    # One pass over the detections: remember each box for drawing and its
+    # crop for Baseten
+    person_boxes = []
+    person_crops = []
+    for person_idx, person in enumerate(detected_people, start=1):
+        bbox = person["bounding_box"]
+        x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
+        person_boxes.append((x1, y1, x2, y2))
+
+        if num_people > 1:
+            detection_type = person.get("detection_type", "person")
+            print(
+                f"   Queueing {detection_type} {person_idx}/{num_people} "
+                f"(confidence: {person['confidence']:.2f})"
+            )
+
+        # Extract person crop from ORIGINAL frame (not blurred), unless
+        # the costume was already classified during inflatable validation.
+        # The crop is a view; the encode reads it without a copy.
+        # Empty boxes are skipped so they can't fail the batch request
+        person_crop = None
+        if (
+            baseten_client
+            and not person.get("costume_classification")
+            and x2 > x1 and y2 > y1
+        ):
+            person_crop = frame[y1:y2, x1:x2]
+        person_crops.append(person_crop)
+
+    # Draw all bounding boxes on the blurred frame in one call
+    # (closed 4-point polylines render exactly like cv2.rectangle)
+    if person_boxes:
+        box_corners = np.array(
+            [
+                [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+                for x1, y1, x2, y2 in person_boxes
+            ],
+            dtype=np.int32,
+        )
+        cv2.polylines(blurred_frame, box_corners, True, (0, 255, 0), 2)
+
+    # Encode blurred frame once in memory; Supabase uploads the bytes directly
+    _, buffer = cv2.imencode(".jpg", blurred_frame, JPEG_PARAMS)
+    frame_jpeg = buffer.tobytes()
+
+    # Keep the detection locally if asked to, or if Supabase is unavailable
+    if SAVE_LOCAL or not supabase_client:
+        with open(filename, "wb") as f:
+            f.write(frame_jpeg)
+        print(f"   Saved locally: {filename}")
+
+    classify_and_upload(detected_people, person_crops, frame_jpeg, detection_timestamp)
+
 
 # Detection parameters
 CONFIDENCE_THRESHOLD = 0.7  # Minimum confidence for person detection
@@ -90,73 +348,81 @@ ROI_X_MAX = 0.7   # Stop at 70% across (excludes street on right)
 ROI_Y_MIN = 0.0   # Start at top of frame
 ROI_Y_MAX = 1.0   # Bottom edge (100%)
 
+# Skip YOLO when the doorstep looks the same as the last frame with motion
+MOTION_THRESHOLD = 2.0  # Mean absolute gray-level difference (0-255)
+MOTION_MIN_FOREGROUND = 0.01  # Fraction of ROI pixels in the foreground (MOG2)
+if MOTION_GATE == "mog2":
+    motion_gate = BackgroundSubtractorGate(
+        MOTION_MIN_FOREGROUND, ROI_X_MIN, ROI_X_MAX, ROI_Y_MIN, ROI_Y_MAX
+    )
+else:
+    motion_gate = MotionGate(
+        MOTION_THRESHOLD, ROI_X_MIN, ROI_X_MAX, ROI_Y_MIN, ROI_Y_MAX
+    )
+
 print(f"🎯 Detection: {CONSECUTIVE_FRAMES_REQUIRED} consecutive frames at >{CONFIDENCE_THRESHOLD} confidence")
 print(f"🎈 Dual-pass: Standard people (class 0) + inflatable costumes (classes 2, 14, 16, 17)")
 print(f"📍 ROI: Doorstep area only (x: {ROI_X_MIN}-{ROI_X_MAX}, y: {ROI_Y_MIN}-{ROI_Y_MAX})")
 print(f"⏱️  Cooldown: {CAPTURE_COOLDOWN}s between captures")
+if MOTION_GATE == "mog2":
+    print(
+        f"🌀 Motion gate: YOLO skipped when <{MOTION_MIN_FOREGROUND:.0%} of the "
+        "doorstep is foreground (MOG2)"
+    )
+else:
+    print(f"🌀 Motion gate: YOLO skipped when doorstep difference <{MOTION_THRESHOLD}")
 
-# Function to check if a bounding box is within the region of interest
-def is_in_roi(bbox, frame_width, frame_height):
-    """Check if bounding box center is within the doorstep ROI."""
-    x1, y1, x2, y2 = bbox
-    # Calculate center of bounding box
-    center_x = (x1 + x2) / 2
-    center_y = (y1 + y2) / 2
-
-    # Normalize to 0-1 range
-    norm_x = center_x / frame_width
-    norm_y = center_y / frame_height
-
-    # Check if center is within ROI bounds
-    return (ROI_X_MIN <= norm_x <= ROI_X_MAX and
-            ROI_Y_MIN <= norm_y <= ROI_Y_MAX)
-
-# Function to connect/reconnect to RTSP stream
-def connect_to_stream(url):
-    """Connect to RTSP stream with optimized settings."""
-    cap = cv2.VideoCapture(url)
-    # Set RTSP transport protocol to TCP (more reliable than UDP)
-    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer to minimize delay
-    cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 10000)  # 10 second connection timeout
-    cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 10000)  # 10 second read timeout
-    return cap
+# Compile the ROI box filter now rather than on the first detection
+warmup()
 
 # Open RTSP stream
-cap = connect_to_stream(rtsp_url)
+cap = connect_to_stream(rtsp_url, RTSP_GST_DECODER)
 
 if not cap.isOpened():
     print("❌ ERROR: Could not connect to DoorBird RTSP stream")
     exit(1)
 
 print("✅ Connected to RTSP stream!")
+
+# Grab frames on a background thread; only sampled frames are retrieved (decoded to BGR)
+reader = FrameReader(cap)
 print()
 print("👁️  Watching for people...")
 print("Press Ctrl+C to stop")
 print()
 
+# Loop timers use time.monotonic() so NTP/DST clock jumps can't stall or
+# trigger the cooldown, health check or reconnect logic
 frame_count = 0
+skipped_frame_count = 0
 detection_count = 0
-last_reconnect_time = time.time()
-last_health_check = time.time()
+last_reconnect_time = time.monotonic()
+last_health_check = time.monotonic()
+last_inference_time = 0
 failed_frame_count = 0
-start_time = time.time()
+start_time = time.monotonic()
 RECONNECT_INTERVAL = 3600  # Reconnect every hour to clear memory
 HEALTH_CHECK_INTERVAL = 300  # Print health stats every 5 minutes
 
 # Detection tracking state
-consecutive_detections = 0  # Count of consecutive frames with person detected
+pending_frames = []  # Sampled frames waiting for the next batched YOLO run
+consecutive_detections = 0  # Count of consecutive batches with person detected
 last_capture_time = 0  # When we last captured an image
 in_cooldown = False  # Whether we're in cooldown period
+roi_frame_shape = None  # Frame size the pixel ROI below was computed for
+ROI_PX = None  # Doorstep ROI in pixels (x_min, x_max, y_min, y_max)
 
 try:
     while True:
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # Health check - print stats every 5 minutes
         if current_time - last_health_check > HEALTH_CHECK_INTERVAL:
             uptime_minutes = (current_time - start_time) / 60
             print(f"\n📊 Health Check (Uptime: {uptime_minutes:.1f} min)")
+            print(f"   Frames read: {reader.frames_read}")
             print(f"   Frames processed: {frame_count}")
+            print(f"   Frames skipped (no motion): {skipped_frame_count}")
             print(f"   Detections: {detection_count}")
             print(f"   Failed frames: {failed_frame_count}")
             print()
@@ -165,74 +431,130 @@ try:
         # Periodic reconnection to prevent memory leaks
         if current_time - last_reconnect_time > RECONNECT_INTERVAL:
             print("🔄 Performing periodic reconnection (memory management)...")
+            reader.stop()
             cap.release()
             time.sleep(1)
-            cap = connect_to_stream(rtsp_url)
+            cap = connect_to_stream(rtsp_url, RTSP_GST_DECODER)
+            reader = FrameReader(cap)
+            motion_gate.reset()
+            pending_frames = []  # Don't batch frames from before the reconnect
             last_reconnect_time = current_time
             if cap.isOpened():
                 print("✅ Reconnected successfully!")
             else:
                 print("❌ Reconnection failed, will retry...")
 
-        # Read frame from stream
-        ret, frame = cap.read()
+        # Sample a frame BATCH_SIZE times per second; sleep until the next
+        # sample is due instead of polling (the reader thread keeps the
+        # stream drained in the meantime)
+        time_until_sample = SAMPLE_INTERVAL - (current_time - last_inference_time)
+        if time_until_sample > 0:
+            time.sleep(time_until_sample)
+            continue
+
+        # Ask the reader thread for the next frame (only requested frames are retrieved)
+        ret, frame = reader.read()
 
         if not ret:
             failed_frame_count += 1
             print("⚠️  Failed to read frame, reconnecting...")
+            reader.stop()
             cap.release()
             time.sleep(2)
-            cap = connect_to_stream(rtsp_url)
-            last_reconnect_time = time.time()  # Reset reconnect timer
+            cap = connect_to_stream(rtsp_url, RTSP_GST_DECODER)
+            reader = FrameReader(cap)
+            motion_gate.reset()
+            pending_frames = []  # Don't batch frames from before the reconnect
+            last_reconnect_time = time.monotonic()  # Reset reconnect timer
             if not cap.isOpened():
                 print("❌ Failed to reconnect, retrying in 5 seconds...")
                 time.sleep(5)
             continue
 
-        frame_count += 1
+        if frame is None:
+            # No frame arrived in time (read() already waited)
+            continue
+
+        last_inference_time = current_time
 
-        # Process every 30 frames (~1 per second at 30fps)
-        if frame_count % 30 != 0:
+        # Check if we're in cooldown period; no YOLO runs until it expires
+        if in_cooldown:
+            time_since_capture = current_time - last_capture_time
+            if time_since_capture < CAPTURE_COOLDOWN:
+                # While in cooldown, ignore all frames and reset counter
+                consecutive_detections = 0
+                pending_frames = []
+                continue
+            # Cooldown expired
+            in_cooldown = False
+            print("✅ Cooldown expired - ready for next detection")
+
+        # Static scene - nothing new at the doorstep, skip YOLO for this frame.
+        # Once someone is being tracked, keep running YOLO regardless so a
+        # visitor standing still at the door still confirms their presence.
+        # A batch started by motion is always filled with the following
+        # samples (still consecutive), so a visitor who steps in and then
+        # stands still reaches YOLO instead of having the batch discarded
+        person_present = consecutive_detections > 0
+        if (
+            not person_present
+            and not pending_frames
+            and not motion_gate.has_motion(frame)
+        ):
+            skipped_frame_count += 1
             continue
 
-        # Run YOLO detection
-        results = model(frame, verbose=False)
+        frame_count += 1
+
+        # Accumulate sampled frames until we have a full batch
+        pending_frames.append(frame)
+        if len(pending_frames) < BATCH_SIZE:
+            continue
 
-        # Get frame dimensions for ROI checking
-        frame_height, frame_width = frame.shape[:2]
+        # Run YOLO detection on the whole batch of downscaled frames in one call
+        # (class + confidence filtering and NMS happen inside YOLO). Rows of
+        # x1, y1, x2, y2, conf, cls in full-resolution frame coordinates.
+        batch_data = detect_boxes_batch(
+            model,
+            pending_frames,
+            classes=DETECTION_CLASSES,
+            conf=CONFIDENCE_THRESHOLD,
+            iou=0.5,
+            max_det=10,
+        )
 
         # DUAL-PASS DETECTION: Check for people OR potential inflatable costumes in ROI
         # PASS 1: Standard person detection (class 0)
         # PASS 2: Potential inflatable costumes (classes 2, 14, 16, 17)
+        # Single vectorized pass over all boxes of each frame; keep the newest
+        # frame with someone in the ROI (or the newest frame if nobody is there)
         people_detected = False
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                cls = int(box.cls[0])
-                # Check both standard people and potential inflatables
-                if cls == PERSON_CLASS or cls in INFLATABLE_CLASSES:
-                    confidence = float(box.conf[0])
-                    if confidence > CONFIDENCE_THRESHOLD:
-                        # Check if detection is in the doorstep ROI
-                        bbox = box.xyxy[0].tolist()
-                        if is_in_roi(bbox, frame_width, frame_height):
-                            people_detected = True
-                            break
-            if people_detected:
-                break
-
-        current_time = time.time()
-
-        # Check if we're in cooldown period
-        if in_cooldown:
-            time_since_capture = current_time - last_capture_time
-            if time_since_capture >= CAPTURE_COOLDOWN:
-                # Cooldown expired
-                in_cooldown = False
-                print("✅ Cooldown expired - ready for next detection")
-            # While in cooldown, ignore all detections and reset counter
-            consecutive_detections = 0
-            continue
+        for batch_frame, batch_frame_data in zip(
+            pending_frames, batch_data, strict=True
+        ):
+            # Convert the ROI to pixels once per frame size (recomputed only
+            # if a reconnect changes the stream resolution)
+            if batch_frame.shape[:2] != roi_frame_shape:
+                roi_frame_shape = batch_frame.shape[:2]
+                frame_height, frame_width = roi_frame_shape
+                ROI_PX = roi_to_pixels(
+                    frame_width,
+                    frame_height,
+                    ROI_X_MIN,
+                    ROI_X_MAX,
+                    ROI_Y_MIN,
+                    ROI_Y_MAX,
+                )
+
+            batch_frame_mask = filter_boxes(
+                batch_frame_data, CONFIDENCE_THRESHOLD, ROI_PX
+            )  # Doorstep ROI only
+            if batch_frame_mask.any() or not people_detected:
+                frame, data, mask = batch_frame, batch_frame_data, batch_frame_mask
+                people_detected = bool(mask.any())
+        pending_frames = []
+
+        current_time = time.monotonic()
 
         # Track consecutive detections
         if people_detected:
@@ -241,154 +563,61 @@ try:
 
             # Check if we have enough consecutive detections to capture
             if consecutive_detections >= CONSECUTIVE_FRAMES_REQUIRED:
-                # Person detected in required consecutive frames - capture!
+                # Person detected in required consecutive batches - capture!
                 print(f"📸 Capturing still ({CONSECUTIVE_FRAMES_REQUIRED} consecutive detections)...")
 
                 detection_count += 1
-                detection_timestamp = datetime.now(ZoneInfo("America/Los_Angeles"))
+                detection_timestamp = datetime.now(LA_TZ)
                 timestamp_str = detection_timestamp.strftime("%Y%m%d_%H%M%S")
                 filename = f"detection_{timestamp_str}.jpg"
 
-                # DUAL-PASS DETECTION: Collect ALL detections using shared detector
-                all_detections = detect_people_and_costumes(
-                    frame,
-                    model,
-                    baseten_client,
-                    confidence_threshold=CONFIDENCE_THRESHOLD,
-                    verbose=True,
-                )
+                # DUAL-PASS DETECTION: Reuse this frame's ROI-filtered boxes
+                # (no second YOLO run, out-of-ROI inflatables never hit Baseten).
+                # PASS 2 validation waits on Baseten, so it runs on io_pool
+                people, potential_inflatables = split_detections(data[mask])
 
-                # Filter detections to only include those in the doorstep ROI
-                detected_people = [
-                    person for person in all_detections
-                    if is_in_roi(
-                        [person["bounding_box"]["x1"], person["bounding_box"]["y1"],
-                         person["bounding_box"]["x2"], person["bounding_box"]["y2"]],
-                        frame_width,
-                        frame_height
-                    )
-                ]
-
-                num_people = len(detected_people)
-                print(f"👤 {num_people} person(s) detected! (Detection #{detection_count})")
-
-                # Start cooldown period immediately after detection (before Baseten call)
+                # Start cooldown period immediately after detection
+                # (before Baseten calls)
                 last_capture_time = current_time
                 in_cooldown = True
                 consecutive_detections = 0
                 print(f"⏸️  Starting {CAPTURE_COOLDOWN}s cooldown period...")
                 print()
 
-                # Process each detected person separately for costume classification (on UNBLURRED frame)
-                # Note: Validated inflatables already have costume data from validation step
-                for person_idx, person in enumerate(detected_people, start=1):
-                    person_conf = person["confidence"]
-                    person_box = person["bounding_box"]
-                    detection_type = person.get("detection_type", "person")
-
-                    if num_people > 1:
-                        print(f"   Processing {detection_type} {person_idx}/{num_people} (confidence: {person_conf:.2f})")
-
-                    # Skip costume classification if already done during inflatable validation
-                    if person.get("costume_classification"):
-                        print(f"   ✓ Costume already classified: {person['costume_classification']}")
-                        continue
-
-                    # Classify costume using Baseten if configured (using original unblurred frame)
-                    costume_classification = None
-                    costume_confidence = None
-                    costume_description = None
-
-                    if baseten_client:
-                        try:
-                            print(f"   🎭 Classifying costume...")
-                            # Extract person crop from ORIGINAL frame (not blurred)
-                            x1, y1, x2, y2 = (
-                                person_box["x1"],
-                                person_box["y1"],
-                                person_box["x2"],
-                                person_box["y2"],
-                            )
-                            person_crop = frame[y1:y2, x1:x2]
-
-                            # Encode image to bytes
-                            _, buffer = cv2.imencode(".jpg", person_crop)
-                            image_bytes = buffer.tobytes()
-
-                            # Classify costume
-                            (
-                                costume_classification,
-                                costume_confidence,
-                                costume_description,
-                            ) = baseten_client.classify_costume(image_bytes)
-
-                            if costume_classification:
-                                print(
-                                    f"   👗 Costume: {costume_classification} ({costume_confidence:.2f})"
-                                )
-                                print(f"      {costume_description}")
-                            else:
-                                print("   ⚠️  Could not classify costume")
-                        except Exception as e:
-                            print(f"   ⚠️  Costume classification failed: {e}")
-
-                    # Store classification results for later use
-                    person["costume_classification"] = costume_classification
-                    person["costume_description"] = costume_description
-                    person["costume_confidence"] = costume_confidence
-
-                # Now blur the frame for privacy before saving/uploading
+                # Blur every candidate box for privacy, including inflatables
+                # that may still be rejected (an unneeded blur is harmless).
+                # Pixelate (downsample 12x, upsample back) only the pixels inside
+                # each box, reading from the original frame so overlapping
+                # boxes are never pixelated twice, and upsampling straight into
+                # the output frame (no per-person image or write-back).
+                # This obscures facial features while keeping costume
+                # colors/shapes visible. The blurred frame is handed to the
+                # worker, so each capture gets its own
                 blurred_frame = frame.copy()
                 num_people_blurred = 0
-
-                for person in detected_people:
+                for person in (*people, *potential_inflatables):
                     bbox = person["bounding_box"]
                     x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
-
-                    # Extract person region
-                    person_region = blurred_frame[y1:y2, x1:x2]
-
-                    # Apply moderate Gaussian blur (kernel size 33)
-                    # This obscures facial features while keeping costume colors/shapes visible
-                    if person_region.size > 0:  # Ensure region is valid
-                        blurred_person = cv2.GaussianBlur(person_region, (33, 33), 0)
-                        blurred_frame[y1:y2, x1:x2] = blurred_person
+                    if x2 > x1 and y2 > y1:  # Ensure region is valid
+                        pixelate(
+                            frame[y1:y2, x1:x2], 12, dst=blurred_frame[y1:y2, x1:x2]
+                        )
                         num_people_blurred += 1
-
-                # Draw bounding boxes on the blurred frame
-                for person in detected_people:
-                    bbox = person["bounding_box"]
-                    x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
-                    cv2.rectangle(blurred_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-                # Save blurred frame locally
-                cv2.imwrite(filename, blurred_frame)
                 print(f"   🔒 {num_people_blurred} person(s) blurred for privacy")
-                print(f"   Saved locally: {filename}")
-
-                # Upload to Supabase if configured
-                for person_idx, person in enumerate(detected_people, start=1):
-                    if supabase_client:
-                        try:
-                            supabase_client.save_detection(
-                                image_path=filename,
-                                timestamp=detection_timestamp,
-                                confidence=person["confidence"],
-                                bounding_box=person["bounding_box"],
-                                costume_classification=person.get("costume_classification"),
-                                costume_description=person.get("costume_description"),
-                                costume_confidence=person.get("costume_confidence"),
-                            )
-                        except Exception as e:
-                            print(f"   ⚠️  Supabase upload failed: {e}")
-
-                # Clean up local file after all persons processed and uploaded
-                try:
-                    if supabase_client and os.path.exists(filename):
-                        os.remove(filename)
-                        print(f"   🗑️  Cleaned up local file: {filename}")
-                except Exception as e:
-                    print(f"   ⚠️  Failed to cleanup local file: {e}")
+
+                # Hand the capture to the background pool for inflatable
+                # validation, costume classification (UNBLURRED crops) and
+                # Supabase upload, so the loop keeps watching
+                io_pool.submit(
+                    process_capture,
+                    frame,
+                    blurred_frame,
+                    people,
+                    potential_inflatables,
+                    detection_count,
+                    detection_timestamp,
+                    filename,
+                )
         else:
             # No person detected - reset consecutive counter
             if consecutive_detections > 0:
@@ -401,5 +630,9 @@ except KeyboardInterrupt:
     print(f"📊 Total detections: {detection_count}")
 
 finally:
+    reader.stop()
     cap.release()
+    # Let in-flight classifications finish (they queue uploads), then the uploads
+    io_pool.shutdown(wait=True)
+    upload_pool.shutdown(wait=True)
     print("✅ Cleanup complete!")
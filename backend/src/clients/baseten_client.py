@@ -4,12 +4,34 @@ Baseten API client for costume classification using vision models.
 Uses Gemma vision model with structured outputs.
 """
 
-import base64
+import binascii
 import json
 import os
+import re
+import time
+from functools import lru_cache
 from typing import Optional, Tuple
 
-import requests
+import httpx
+
+# orjson is optional; it serializes requests (with their large base64 image
+# strings) and parses replies faster than the json module
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+
+    def _json_dumps(obj) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes (same output shape as orjson)."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    _json_loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 # Allowed costume categories for classification
 ALLOWED_CATEGORIES = [
@@ -75,6 +97,131 @@ ALLOWED_CATEGORIES = [
     "Other",      # Doesn't fit any category
 ]
 
+# JSON object the model returns for each classified costume
+COSTUME_JSON_FORMAT = (
+    '{"classification": "costume type", "confidence": 0.95, '
+    '"description": "costume description"}'
+)
+
+# Category and field guidelines shared by the single and batch prompts
+COSTUME_GUIDELINES = (
+    "Preferred categories:\n"
+    "- witch, vampire, zombie, skeleton, ghost\n"
+    "- superhero, princess, pirate, ninja, clown, monster\n"
+    "- character (for recognizable characters like Spiderman, Elsa, Mickey Mouse)\n"
+    "- animal (for animal costumes like tiger, cat, dinosaur)\n"
+    "- person (if no costume visible)\n"
+    "- classic monsters: mummy, frankenstein, werewolf, grim reaper, demon, devil\n"
+    "- fantasy/mythical: fairy, mermaid, wizard, dragon, elf, sorcerer/sorceress\n"
+    "- historical/warrior: knight, viking, samurai, gladiator, pharaoh, "
+    "greek god/goddess\n"
+    "- occupations: doctor, nurse, police officer, firefighter, chef, detective, "
+    "astronaut, ghostbuster\n"
+    "- western/sport/dance: cowboy, cowgirl, ballerina, cheerleader, athlete\n"
+    "- sci-fi/other: alien, robot, dinosaur, pumpkin, scarecrow, jester, mime, "
+    "hippie, rocker, steampunk, royalty, pirate wench\n\n"
+    "- other (if costume doesn't fit above categories)\n"
+    "Rules:\n"
+    "- classification: Use one of the preferred categories above\n"
+    "- confidence: Your confidence score between 0.0 and 1.0\n"
+    "- description: A short description focused on the costume itself "
+    "(e.g., 'An astronaut with a space helmet', 'A pop-star holding a microphone', "
+    "'A witch with a pointed hat'). Describe the costume elements directly, not the "
+    "person or their clothing. If no costume is visible, use 'No costume'.\n"
+)
+
+# Default prompt optimized for Halloween costume classification (built once)
+DEFAULT_PROMPT = (
+    "Analyze this Halloween costume and respond with ONLY a JSON object in this "
+    "exact format:\n"
+    f"{COSTUME_JSON_FORMAT}\n\n"
+    f"{COSTUME_GUIDELINES}"
+    "- Output ONLY the JSON object, nothing else"
+)
+
+
+@lru_cache(maxsize=16)
+def _batch_prompt(num_images: int) -> str:
+    """
+    Build (once per batch size) the prompt for classifying several images.
+
+    Args:
+        num_images: Number of images in the request
+
+    Returns:
+        Prompt asking for a JSON array with one object per image
+    """
+    return (
+        f"You are given {num_images} images, each showing one person at a door "
+        "on Halloween. Analyze the costume in each image and respond with ONLY a "
+        f"JSON array of {num_images} objects, "
+        "one per image in the same order as the images, each in this exact format:\n"
+        f"{COSTUME_JSON_FORMAT}\n\n"
+        f"{COSTUME_GUIDELINES}"
+        "- Output ONLY the JSON array, nothing else"
+    )
+
+
+# Outermost JSON object or array in a response (greedy, so nested objects
+# inside an array stay intact)
+_JSON_RE = re.compile(r"[{\[].*[}\]]", re.S)
+
+# Retries for requests that fail before reaching the model: connection
+# errors are retried by the transport, gateway errors (model cold start,
+# replica restart) by _post() with exponential backoff
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.2  # Seconds before the first retry, doubled for each next one
+RETRY_STATUS_CODES = {502, 503, 504}
+
+
+DATA_URI_PREFIX = b"data:image/jpeg;base64,"
+BASE64_CHUNK = 3 * 65536  # Multiple of 3, so chunks encode without padding
+
+
+def _image_data_uri(image_bytes: bytes) -> str:
+    """
+    Build a base64 JPEG data URI with a single full-size intermediate copy.
+
+    The image is base64-encoded in chunks straight into a preallocated
+    buffer that already holds the prefix, then decoded to str once (instead
+    of separate base64 bytes, base64 str and concatenated URI copies).
+
+    Args:
+        image_bytes: JPEG image data
+
+    Returns:
+        "data:image/jpeg;base64,..." string
+    """
+    view = memoryview(image_bytes)
+    prefix_len = len(DATA_URI_PREFIX)
+    buffer = bytearray(prefix_len + 4 * ((len(view) + 2) // 3))
+    buffer[:prefix_len] = DATA_URI_PREFIX
+
+    pos = prefix_len
+    for start in range(0, len(view), BASE64_CHUNK):
+        encoded = binascii.b2a_base64(view[start:start + BASE64_CHUNK], newline=False)
+        buffer[pos:pos + len(encoded)] = encoded
+        pos += len(encoded)
+    return buffer.decode("ascii")
+
+
+def _extract_json(content: str) -> str:
+    """
+    Extract the JSON payload from a model response in a single regex pass.
+
+    Skips markdown code fences, surrounding prose and trailing artifacts
+    like <end_of_turn> by taking everything from the first opening brace or
+    bracket to the last closing one.
+
+    Args:
+        content: Raw message content returned by the model
+
+    Returns:
+        The JSON object/array text (or the stripped content if none is found)
+    """
+    match = _JSON_RE.search(content)
+    return match.group(0) if match else content.strip()
+
 
 class BasetenClient:
     """Client for Baseten vision model API"""
@@ -94,9 +241,23 @@ class BasetenClient:
         if not self.model_url:
             raise ValueError("BASETEN_MODEL_URL environment variable not set")
 
-        # Build session so connections can be re-used across requests
-        self.session = requests.Session()
-        self.session.headers.update({"Authorization": f"Api-Key {self.api_key}"})
+        # One HTTP/2 keep-alive client for all requests, so concurrent
+        # classifications multiplex over a single connection and never pay
+        # for a new TLS handshake while the pool is warm
+        self.session = httpx.Client(
+            headers={"Authorization": f"Api-Key {self.api_key}"},
+            # Vision model replies can be slow
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            transport=httpx.HTTPTransport(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=16,
+                    max_keepalive_connections=16,
+                    keepalive_expiry=60.0,
+                ),
+                retries=MAX_RETRIES,  # Connection errors only
+            ),
+        )
 
         # Model configuration
         self.model = "gemma"
@@ -128,106 +289,189 @@ class BasetenClient:
             witch (0.95): witch with purple hat and broom
         """
         try:
-            # Encode image to base64
-            img_base64 = base64.b64encode(image_bytes).decode("utf-8")
-            data_uri = f"data:image/jpeg;base64,{img_base64}"
-
-            # Default prompt optimized for Halloween costume classification
-            prompt = custom_prompt or (
-                "Analyze this Halloween costume and respond with ONLY a JSON object in this exact format:\n"
-                '{"classification": "costume type", "confidence": 0.95, "description": "costume description"}\n\n'
-                "Preferred categories:\n"
-                "- witch, vampire, zombie, skeleton, ghost\n"
-                "- superhero, princess, pirate, ninja, clown, monster\n"
-                "- character (for recognizable characters like Spiderman, Elsa, Mickey Mouse)\n"
-                "- animal (for animal costumes like tiger, cat, dinosaur)\n"
-                "- person (if no costume visible)\n"
-                "- classic monsters: mummy, frankenstein, werewolf, grim reaper, demon, devil\n"
-                "- fantasy/mythical: fairy, mermaid, wizard, dragon, elf, sorcerer/sorceress\n"
-                "- historical/warrior: knight, viking, samurai, gladiator, pharaoh, greek god/goddess\n"
-                "- occupations: doctor, nurse, police officer, firefighter, chef, detective, astronaut, ghostbuster\n"
-                "- western/sport/dance: cowboy, cowgirl, ballerina, cheerleader, athlete\n"
-                "- sci-fi/other: alien, robot, dinosaur, pumpkin, scarecrow, jester, mime, hippie, rocker, steampunk, royalty, pirate wench\n\n"
-                "- other (if costume doesn't fit above categories)\n"
-                "Rules:\n"
-                "- classification: Use one of the preferred categories above\n"
-                "- confidence: Your confidence score between 0.0 and 1.0\n"
-                "- description: A short description focused on the costume itself (e.g., 'An astronaut with a space helmet', 'A pop-star holding a microphone', 'A witch with a pointed hat'). Describe the costume elements directly, not the person or their clothing. If no costume is visible, use 'No costume'.\n"
-                "- Output ONLY the JSON object, nothing else"
-            )
-
             # Call Baseten API with Gemma vision model
-            response = self.session.post(
-                self.model_url,
-                json={
-                    "model": self.model,
-                    "stream": False,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": prompt},
-                                {"type": "image_url", "image_url": {"url": data_uri}},
-                            ],
-                        }
-                    ],
-                    "max_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                },
+            response = self._post(
+                self._classification_request(image_bytes, custom_prompt)
             )
 
             # Check for HTTP errors
             response.raise_for_status()
 
             # Parse response
-            result = response.json()
+            result = _json_loads(response.content)
+            return self._parse_classification(result)
+
+        except httpx.HTTPError as e:
+            print(f"⚠️  Baseten API request error: {e}")
+            return None, None, None
+        except json.JSONDecodeError as e:
+            print(f"⚠️  Failed to parse JSON response: {e}")
+            print(f"   Raw content: {e.doc}")
+            return None, None, None
+        except Exception as e:
+            print(f"⚠️  Baseten API error: {e}")
+            return None, None, None
+
+    def _post(self, body: dict) -> httpx.Response:
+        """
+        POST a request body to the model, retrying gateway errors.
 
-            # Extract content from response
-            if "choices" in result and len(result["choices"]) > 0:
-                content = result["choices"][0].get("message", {}).get("content", "")
-            else:
-                print(f"⚠️  Unexpected response format: {result}")
-                return None, None, None
+        Args:
+            body: JSON request body
 
-            if not content:
-                return None, None, None
+        Returns:
+            The last response (check its status with raise_for_status())
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            response = self.session.post(
+                self.model_url, content=_json_dumps(body), headers=JSON_HEADERS
+            )
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            time.sleep(RETRY_BACKOFF * 2**attempt)
 
-            # Clean up content - remove markdown code blocks and model artifacts
-            content = content.strip()
+    def _classification_request(
+        self, image_bytes: bytes, custom_prompt: Optional[str] = None
+    ) -> dict:
+        """
+        Build the chat completion request body for a single costume image.
 
-            # Remove markdown code fences
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
+        Args:
+            image_bytes: Image data as bytes (JPEG/PNG format)
+            custom_prompt: Optional custom prompt (uses default if not provided)
 
-            # Remove trailing artifacts like ```<end_of_turn>, ``` etc.
-            # Split on common delimiters and take the first part
-            for delimiter in ["```", "<end_of_turn>", "\n```", "```\n"]:
-                if delimiter in content:
-                    content = content.split(delimiter)[0]
+        Returns:
+            JSON request body for the Baseten model endpoint
+        """
+        # Encode image to a base64 data URI
+        data_uri = _image_data_uri(image_bytes)
 
-            content = content.strip()
+        return {
+            "model": self.model,
+            "stream": False,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": custom_prompt or DEFAULT_PROMPT},
+                        {"type": "image_url", "image_url": {"url": data_uri}},
+                    ],
+                }
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
 
-            # Parse JSON response
-            parsed_result = json.loads(content)
+    def _parse_classification(
+        self, result: dict
+    ) -> Tuple[Optional[str], Optional[float], Optional[str]]:
+        """
+        Extract (classification, confidence, description) from a model response.
 
-            classification = parsed_result.get("classification", "unknown")
-            confidence = float(parsed_result.get("confidence", 0.0))
-            description = parsed_result.get("description", "")
+        Args:
+            result: Decoded JSON response from the Baseten model endpoint
 
-            return classification, confidence, description
+        Returns:
+            Tuple of (classification, confidence, description), all None if
+            the response has no content
 
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  Baseten API request error: {e}")
+        Raises:
+            json.JSONDecodeError: If the message content is not valid JSON
+        """
+        # Extract content from response
+        if "choices" in result and len(result["choices"]) > 0:
+            content = result["choices"][0].get("message", {}).get("content", "")
+        else:
+            print(f"⚠️  Unexpected response format: {result}")
             return None, None, None
-        except json.JSONDecodeError as e:
-            print(f"⚠️  Failed to parse JSON response: {e}")
-            print(f"   Raw content: {content if 'content' in locals() else 'N/A'}")
+
+        if not content:
             return None, None, None
+
+        # Parse JSON response
+        parsed_result = _json_loads(_extract_json(content))
+
+        classification = parsed_result.get("classification", "unknown")
+        confidence = float(parsed_result.get("confidence", 0.0))
+        description = parsed_result.get("description", "")
+
+        return classification, confidence, description
+
+    def classify_costumes(
+        self, images: list[bytes]
+    ) -> list[Tuple[Optional[str], Optional[float], Optional[str]]]:
+        """
+        Classify several costume crops with a single Baseten request.
+
+        All images go into one multi-image message and the model returns a
+        JSON array with one object per image, so N crops cost one round-trip
+        instead of N. A single image uses the regular classify_costume()
+        prompt. If the batch reply cannot be aligned with the inputs, each
+        image is classified on its own instead.
+
+        Args:
+            images: Image data as bytes (JPEG/PNG format), one per crop
+
+        Returns:
+            List of (classification, confidence, description) tuples in the
+            same order as `images` (all None for a failed classification)
+
+        Example:
+            >>> client = BasetenClient()
+            >>> results = client.classify_costumes([witch_bytes, ghost_bytes])
+            >>> [classification for classification, _, _ in results]
+            ['witch', 'ghost']
+        """
+        if len(images) <= 1:
+            return [self.classify_costume(image_bytes) for image_bytes in images]
+
+        try:
+            content_parts = [{"type": "text", "text": _batch_prompt(len(images))}]
+            for image_bytes in images:
+                content_parts.append(
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": _image_data_uri(image_bytes)},
+                    }
+                )
+
+            response = self._post(
+                {
+                    "model": self.model,
+                    "stream": False,
+                    "messages": [{"role": "user", "content": content_parts}],
+                    "max_tokens": self.max_tokens * len(images),
+                    "temperature": self.temperature,
+                }
+            )
+            response.raise_for_status()
+            result = _json_loads(response.content)
+
+            content = result["choices"][0]["message"]["content"]
+            parsed_results = _json_loads(_extract_json(content))
+            if not isinstance(parsed_results, list) or (
+                len(parsed_results) != len(images)
+            ):
+                raise ValueError(
+                    f"expected {len(images)} results, got {parsed_results!r}"
+                )
+
+            return [
+                (
+                    parsed.get("classification", "unknown"),
+                    float(parsed.get("confidence", 0.0)),
+                    parsed.get("description", ""),
+                )
+                for parsed in parsed_results
+            ]
+
+        except httpx.HTTPError as e:
+            print(f"⚠️  Baseten API request error: {e}")
+            return [(None, None, None)] * len(images)
         except Exception as e:
-            print(f"⚠️  Baseten API error: {e}")
-            return None, None, None
+            # Malformed batch reply - fall back to one request per image
+            print(f"⚠️  Batch classification failed, classifying individually: {e}")
+            return [self.classify_costume(image_bytes) for image_bytes in images]
 
     def test_connection(self) -> bool:
         """
@@ -15,6 +15,9 @@ from supabase import Client, create_client
 # Load environment variables
 load_dotenv()
 
+# Maximum detection records sent in one insert request
+INSERT_BATCH_SIZE = 100
+
 
 class SupabaseClient:
     """Client for interacting with Supabase database and storage."""
@@ -37,26 +40,35 @@ class SupabaseClient:
         self.bucket_name = "detection-images"
 
     def upload_detection_image(
-        self, image_path: str, timestamp: datetime
+        self,
+        image_path: Optional[str],
+        timestamp: datetime,
+        image_bytes: Optional[bytes] = None,
     ) -> Optional[str]:
         """
         Upload detection image to Supabase storage.
 
         Args:
-            image_path: Local path to image file
+            image_path: Local path to image file (ignored if image_bytes is given)
             timestamp: Timestamp of detection
+            image_bytes: Already-encoded JPEG data, uploaded without touching disk
 
         Returns:
             Public URL of uploaded image, or None if upload fails
         """
         try:
-            # Generate storage path: device_id/YYYYMMDD_HHMMSS.jpg
-            filename = timestamp.strftime("%Y%m%d_%H%M%S.jpg")
+            # Generate storage path: device_id/YYYYMMDD_HHMMSS_ffffff.jpg
+            # (microseconds keep detections saved together from overwriting
+            # each other's images)
+            filename = timestamp.strftime("%Y%m%d_%H%M%S_%f.jpg")
             storage_path = f"{self.device_id}/{filename}"
 
-            # Read image file
-            with open(image_path, "rb") as f:
-                image_data = f.read()
+            # Read image file unless the encoded image was passed in directly
+            if image_bytes is not None:
+                image_data = image_bytes
+            else:
+                with open(image_path, "rb") as f:
+                    image_data = f.read()
 
             # Upload to Supabase storage (upsert to handle duplicates)
             self.client.storage.from_(self.bucket_name).upload(
@@ -102,22 +114,15 @@ class SupabaseClient:
             Inserted record data, or None if insert fails
         """
         try:
-            data = {
-                "timestamp": timestamp.isoformat(),
-                "confidence": confidence,
-                "bounding_box": bounding_box,
-                "device_id": self.device_id,
-            }
-
-            # Add optional fields if provided
-            if image_url:
-                data["image_url"] = image_url
-            if costume_classification:
-                data["costume_classification"] = costume_classification
-            if costume_description:
-                data["costume_description"] = costume_description
-            if costume_confidence is not None:
-                data["costume_confidence"] = costume_confidence
+            data = self._detection_row(
+                timestamp,
+                confidence,
+                bounding_box,
+                image_url,
+                costume_classification,
+                costume_description,
+                costume_confidence,
+            )
 
             # Insert into database
             response = (
@@ -132,33 +137,93 @@ class SupabaseClient:
             print(f"❌ Error inserting detection: {e}")
             return None
 
+    def _detection_row(
+        self,
+        timestamp: datetime,
+        confidence: float,
+        bounding_box: dict,
+        image_url: Optional[str] = None,
+        costume_classification: Optional[str] = None,
+        costume_description: Optional[str] = None,
+        costume_confidence: Optional[float] = None,
+    ) -> dict:
+        """
+        Build a person_detections record (see insert_detection for the fields).
+
+        Returns:
+            Record dict with only the optional fields that are set
+        """
+        data = {
+            "timestamp": timestamp.isoformat(),
+            "confidence": confidence,
+            "bounding_box": bounding_box,
+            "device_id": self.device_id,
+        }
+
+        # Add optional fields if provided
+        if image_url:
+            data["image_url"] = image_url
+        if costume_classification:
+            data["costume_classification"] = costume_classification
+        if costume_description:
+            data["costume_description"] = costume_description
+        if costume_confidence is not None:
+            data["costume_confidence"] = costume_confidence
+        return data
+
+    def insert_detections(self, rows: list[dict]) -> list[bool]:
+        """
+        Insert several detection records with one request per INSERT_BATCH_SIZE rows.
+
+        Args:
+            rows: Records built by _detection_row()
+
+        Returns:
+            For each row, True if it was inserted
+        """
+        inserted = []
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[start:start + INSERT_BATCH_SIZE]
+            try:
+                response = (
+                    self.client.table("person_detections").insert(batch).execute()
+                )
+                inserted.extend([len(response.data or []) == len(batch)] * len(batch))
+            except Exception as e:
+                print(f"❌ Error inserting {len(batch)} detection(s): {e}")
+                inserted.extend([False] * len(batch))
+        return inserted
+
     def save_detection(
         self,
-        image_path: str,
+        image_path: Optional[str],
         timestamp: datetime,
         confidence: float,
         bounding_box: dict,
         costume_classification: Optional[str] = None,
         costume_description: Optional[str] = None,
         costume_confidence: Optional[float] = None,
+        image_bytes: Optional[bytes] = None,
     ) -> bool:
         """
         Complete workflow: upload image and insert detection record.
 
         Args:
-            image_path: Local path to detection image
+            image_path: Local path to detection image (ignored if image_bytes is given)
             timestamp: When person was detected
             confidence: YOLO confidence score
             bounding_box: Dict with x1, y1, x2, y2 coordinates
             costume_classification: AI costume type (e.g., "witch", "skeleton") (optional)
             costume_description: Detailed costume description (optional)
             costume_confidence: AI classification confidence (optional)
+            image_bytes: Encoded JPEG data to upload instead of reading
+                         image_path (optional)
 
         Returns:
             True if successful, False otherwise
         """
         # Upload image
-        image_url = self.upload_detection_image(image_path, timestamp)
+        image_url = self.upload_detection_image(image_path, timestamp, image_bytes)
 
         if not image_url:
             print("⚠️  Image upload failed, saving detection without image URL")
@@ -183,6 +248,43 @@ class SupabaseClient:
             print("❌ Failed to save detection to Supabase")
             return False
 
+    def save_detections_batch(self, detections: list[dict]) -> list[bool]:
+        """
+        Upload several detections' images, then insert all records together.
+
+        Same workflow as save_detection(), but the database inserts are
+        merged into batched requests instead of one request per detection.
+
+        Args:
+            detections: Keyword arguments of save_detection() for each detection
+
+        Returns:
+            For each detection, True if its record was saved
+        """
+        rows = []
+        for detection in detections:
+            image_url = self.upload_detection_image(
+                detection.get("image_path"),
+                detection["timestamp"],
+                detection.get("image_bytes"),
+            )
+            if not image_url:
+                print("⚠️  Image upload failed, saving detection without image URL")
+
+            rows.append(self._detection_row(
+                timestamp=detection["timestamp"],
+                confidence=detection["confidence"],
+                bounding_box=detection["bounding_box"],
+                image_url=image_url,
+                costume_classification=detection.get("costume_classification"),
+                costume_description=detection.get("costume_description"),
+                costume_confidence=detection.get("costume_confidence"),
+            ))
+
+        saved = self.insert_detections(rows)
+        print(f"✅ Saved {sum(saved)}/{len(rows)} detection(s) to Supabase")
+        return saved
+
     def get_recent_detections(self, limit: int = 10) -> list:
         """
         Retrieve recent person detections.
@@ -13,23 +13,229 @@ This approach ensures we capture both regular costumes and inflatable/bulky
 costumes that YOLO may misclassify as objects (cars, animals, etc.).
 """
 
+from typing import Optional
+
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
 from backend.src.clients.baseten_client import BasetenClient
+from backend.src.detection.yolo_model import DetectorModel, detect_boxes
 
 # YOLO COCO classes for dual-pass detection
 PERSON_CLASS = 0
 INFLATABLE_CLASSES = [2, 14, 16, 17]  # car, bird, dog, cat (common misclassifications for inflatables)
+# COCO names of the inflatable classes, so detection never goes through the
+# model wrapper
+INFLATABLE_CLASS_NAMES = {2: "car", 14: "bird", 16: "dog", 17: "cat"}
+DETECTION_CLASSES = [PERSON_CLASS, *INFLATABLE_CLASSES]  # Passed to YOLO as classes=
+
+# JPEG settings for saved frames (smaller payload, cheaper
+# single-pass encode: no Huffman optimization, baseline rather than progressive)
+JPEG_PARAMS = [
+    cv2.IMWRITE_JPEG_QUALITY, 80,
+    cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+    cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+]
+
+
+# Longest edge of a crop sent to Baseten; the vision model works at
+# ~448-1024 px, so larger crops only add upload time
+CROP_MAX_EDGE = 1024
+
+# Crop JPEG quality by pixel area: small crops keep more detail per pixel,
+# large ones have detail to spare and make up most of the upload bytes.
+# (max pixel area, encoder params), checked in order; built once at import
+CROP_JPEG_PARAMS = [
+    (max_area, [
+        cv2.IMWRITE_JPEG_QUALITY, quality,
+        cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+        cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+    ])
+    for max_area, quality in ((256 * 256, 85), (512 * 512, 75), (None, 65))
+]
+
+
+def encode_crop(crop: np.ndarray) -> bytes:
+    """
+    Encode an image crop as JPEG bytes for Baseten classification.
+
+    Crops larger than CROP_MAX_EDGE are downscaled first, and the JPEG
+    quality drops as the crop area grows (see CROP_JPEG_PARAMS).
+
+    Args:
+        crop: Image crop as numpy array (BGR format), not empty
+
+    Returns:
+        JPEG-encoded image bytes
+
+    Raises:
+        ValueError: If the crop has no pixels
+    """
+    height, width = crop.shape[:2]
+    if height == 0 or width == 0:
+        raise ValueError("Cannot encode an empty crop")
+    scale = CROP_MAX_EDGE / max(height, width)
+    if scale < 1:
+        crop = cv2.resize(
+            crop,
+            (max(1, int(width * scale)), max(1, int(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        height, width = crop.shape[:2]
+
+    area = height * width
+    params = next(
+        params
+        for max_area, params in CROP_JPEG_PARAMS
+        if max_area is None or area < max_area
+    )
+    _, buffer = cv2.imencode(".jpg", crop, params)
+    return buffer.tobytes()
+
+
+def split_detections(detections: np.ndarray) -> tuple[list[dict], list[dict]]:
+    """
+    Split filtered YOLO boxes into people and potential inflatable costumes.
+
+    Args:
+        detections: Rows of (x1, y1, x2, y2, conf, cls) from detect_boxes(),
+                    already filtered (confidence, ROI)
+
+    Returns:
+        Tuple of (person detections, unvalidated inflatable detections), as
+        detection dicts (see detect_people_and_costumes())
+    """
+    # PASS 1: Collect standard person detections (class 0)
+    # Boxes are already filtered, so split them by class with array masks
+    # and convert each column to Python values in one call
+    boxes = detections[:, :4].astype(np.int32).tolist()
+    confidences = detections[:, 4].tolist()
+    classes = detections[:, 5].astype(np.int32)
+    person_indices = np.flatnonzero(classes == PERSON_CLASS).tolist()
+    inflatable_indices = np.flatnonzero(np.isin(classes, INFLATABLE_CLASSES)).tolist()
+    classes = classes.tolist()
+
+    # Boxes clipped to zero width or height have no pixels to classify; drop
+    # them here so one empty crop can't fail the whole Pass 2 request
+    inflatable_indices = [
+        i for i in inflatable_indices
+        if boxes[i][2] > boxes[i][0] and boxes[i][3] > boxes[i][1]
+    ]
+
+    # Standard person detections
+    detected_people = [
+        {
+            "confidence": confidences[i],
+            "bounding_box": dict(zip(("x1", "y1", "x2", "y2"), boxes[i], strict=True)),
+            "detection_type": "person",
+            "yolo_class": PERSON_CLASS,
+        }
+        for i in person_indices
+    ]
+
+    # Potential inflatable costumes (need validation)
+    potential_inflatables = [
+        {
+            "confidence": confidences[i],
+            "bounding_box": dict(zip(("x1", "y1", "x2", "y2"), boxes[i], strict=True)),
+            "detection_type": "inflatable",
+            "yolo_class": classes[i],
+            "yolo_class_name": INFLATABLE_CLASS_NAMES[classes[i]],
+        }
+        for i in inflatable_indices
+    ]
+
+    return detected_people, potential_inflatables
+
+
+def validate_inflatables(
+    frame: np.ndarray,
+    potential_inflatables: list[dict],
+    baseten_client: BasetenClient,
+    verbose: bool = False,
+) -> list[dict]:
+    """
+    PASS 2: Keep the potential inflatables Baseten classifies as costumes.
+
+    All crops go to Baseten in a single request. This blocks on the network,
+    so the detection loop runs it on a background worker.
+
+    Args:
+        frame: Unblurred frame the detections came from (BGR)
+        potential_inflatables: Inflatable detections from split_detections()
+        baseten_client: Baseten client for costume classification
+        verbose: Print detailed validation information (default: False)
+
+    Returns:
+        The validated inflatables, with costume_classification,
+        costume_description and costume_confidence filled in
+    """
+    if verbose:
+        print(
+            f"   Validating {len(potential_inflatables)} potential inflatable "
+            "costume(s)..."
+        )
+
+    validated = []
+
+    # Classify every crop in one multi-image request, then validate in order
+    try:
+        # The crops are row-strided views that imencode reads without a copy
+        bboxes = [inflatable["bounding_box"] for inflatable in potential_inflatables]
+        image_bytes_list = [
+            encode_crop(frame[bbox["y1"]:bbox["y2"], bbox["x1"]:bbox["x2"]])
+            for bbox in bboxes
+        ]
+        classifications = baseten_client.classify_costumes(image_bytes_list)
+    except Exception as e:
+        if verbose:
+            print(
+                f"   ⚠️  Validation failed for {len(potential_inflatables)} "
+                f"inflatable(s): {e}"
+            )
+        classifications = []
+
+    for inflatable, (
+        costume_classification,
+        costume_confidence,
+        costume_description,
+    ) in zip(potential_inflatables, classifications, strict=False):
+        # (classifications is empty if the request failed: nothing validates)
+        # Only validate if we got a real costume classification
+        # Reject if: no classification, or "person" with "No costume"
+        is_valid = costume_classification and not (
+            costume_classification.lower() == "person"
+            and costume_description
+            and "no costume" in costume_description.lower()
+        )
+
+        if is_valid:
+            if verbose:
+                print(
+                    f"   ✅ Validated inflatable: {costume_classification} "
+                    f"(YOLO saw as {inflatable['yolo_class_name']})"
+                )
+            inflatable["costume_classification"] = costume_classification
+            inflatable["costume_description"] = costume_description
+            inflatable["costume_confidence"] = costume_confidence
+            validated.append(inflatable)
+        else:
+            if verbose:
+                print(
+                    f"   ❌ Rejected {inflatable['yolo_class_name']} "
+                    "(not a costume)"
+                )
+
+    return validated
 
 
 def detect_people_and_costumes(
     frame: np.ndarray,
-    model: YOLO,
+    model: DetectorModel,
     baseten_client: BasetenClient,
     confidence_threshold: float = 0.7,
     verbose: bool = False,
+    detections: Optional[np.ndarray] = None,
 ) -> list[dict]:
     """
     Detect people and costumes using dual-pass YOLO detection.
@@ -42,10 +248,13 @@ def detect_people_and_costumes(
 
     Args:
         frame: Input image as numpy array (BGR format from cv2.imread)
-        model: YOLOv8 model instance
+        model: Model returned by load_yolo_model()
         baseten_client: Baseten client for costume classification
         confidence_threshold: Minimum confidence for YOLO detections (default: 0.7)
         verbose: Print detailed detection information (default: False)
+        detections: Precomputed boxes from detect_boxes() for this frame,
+                    already filtered (confidence, ROI). Skips running YOLO
+                    and re-checking each box when the caller already has them.
 
     Returns:
         List of detection dicts, each containing:
@@ -59,7 +268,7 @@ def detect_people_and_costumes(
         - costume_confidence: Classification confidence if validated (float, optional)
 
     Example:
-        >>> model = YOLO("yolov8n.pt")
+        >>> model = load_yolo_model()
         >>> baseten_client = BasetenClient()
         >>> frame = cv2.imread("doorbell.jpg")
         >>> detections = detect_people_and_costumes(frame, model, baseten_client)
@@ -68,41 +277,14 @@ def detect_people_and_costumes(
     if verbose:
         print("🔍 Running YOLO dual-pass detection...")
 
-    # Run YOLO detection
-    results = model(frame, verbose=False)
+    # Run YOLO detection (unless the caller already did)
+    if detections is None:
+        detections = detect_boxes(
+            model, frame, classes=DETECTION_CLASSES, conf=confidence_threshold
+        )
+        detections = detections[detections[:, 4] > confidence_threshold]
 
-    # PASS 1: Collect standard person detections (class 0)
-    detected_people = []
-    potential_inflatables = []
-
-    for result in results:
-        boxes = result.boxes
-        for box in boxes:
-            cls = int(box.cls[0])
-            conf = float(box.conf[0])
-
-            if conf > confidence_threshold:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                bbox_dict = {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
-
-                if cls == PERSON_CLASS:
-                    # Standard person detection
-                    detected_people.append({
-                        "confidence": conf,
-                        "bounding_box": bbox_dict,
-                        "detection_type": "person",
-                        "yolo_class": cls,
-                    })
-                elif cls in INFLATABLE_CLASSES:
-                    # Potential inflatable costume (needs validation)
-                    class_name = model.names[cls]
-                    potential_inflatables.append({
-                        "confidence": conf,
-                        "bounding_box": bbox_dict,
-                        "detection_type": "inflatable",
-                        "yolo_class": cls,
-                        "yolo_class_name": class_name,
-                    })
+    detected_people, potential_inflatables = split_detections(detections)
 
     if verbose:
         print(f"✅ PASS 1: Detected {len(detected_people)} standard person(s)")
@@ -110,43 +292,8 @@ def detect_people_and_costumes(
 
     # PASS 2: Validate potential inflatable costumes with Baseten
     if baseten_client and potential_inflatables:
-        if verbose:
-            print(f"   Validating {len(potential_inflatables)} potential inflatable costume(s)...")
-
-        for inflatable in potential_inflatables:
-            try:
-                bbox = inflatable["bounding_box"]
-                x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
-                crop = frame[y1:y2, x1:x2]
-                _, buffer = cv2.imencode('.jpg', crop)
-                image_bytes = buffer.tobytes()
-
-                (
-                    costume_classification,
-                    costume_confidence,
-                    costume_description,
-                ) = baseten_client.classify_costume(image_bytes)
-
-                # Only validate if we got a real costume classification
-                # Reject if: no classification, or "person" with "No costume"
-                is_valid = (
-                    costume_classification and
-                    not (costume_classification.lower() == "person" and
-                         costume_description and "no costume" in costume_description.lower())
-                )
-
-                if is_valid:
-                    if verbose:
-                        print(f"   ✅ Validated inflatable: {costume_classification} (YOLO saw as {inflatable['yolo_class_name']})")
-                    inflatable["costume_classification"] = costume_classification
-                    inflatable["costume_description"] = costume_description
-                    inflatable["costume_confidence"] = costume_confidence
-                    detected_people.append(inflatable)
-                else:
-                    if verbose:
-                        print(f"   ❌ Rejected {inflatable['yolo_class_name']} (not a costume)")
-            except Exception as e:
-                if verbose:
-                    print(f"   ⚠️  Validation failed for {inflatable.get('yolo_class_name', 'unknown')}: {e}")
+        detected_people.extend(
+            validate_inflatables(frame, potential_inflatables, baseten_client, verbose)
+        )
 
     return detected_people
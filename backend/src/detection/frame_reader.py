@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Background RTSP frame reader.
+
+Pulls frames from a cv2.VideoCapture on a dedicated thread so RTSP decode
+never blocks detection. Every frame is grabbed to keep the stream current,
+but only the frames the detection loop actually asks for are retrieved
+(converted to BGR and copied out), so the frames in between cost no color
+conversion or copy traffic.
+
+This is a producer/consumer pipeline with a queue depth of one: a frame
+that is not picked up is replaced by the next one rather than queued, so
+the detection loop always gets the freshest frame and never works through
+a backlog after a slow YOLO run.
+"""
+
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class FrameReader:
+    """Grabs frames on a daemon thread and retrieves one whenever it is requested."""
+
+    def __init__(self, cap: cv2.VideoCapture):
+        """
+        Start reading frames from an opened capture.
+
+        Args:
+            cap: Opened cv2.VideoCapture (the reader does not release it)
+        """
+        self.cap = cap
+        self.frames_read = 0
+
+        self._cond = threading.Condition()
+        self._latest: Optional[np.ndarray] = None
+        self._wanted = False
+        self._failed = False
+        self._running = True
+
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self._thread.start()
+
+    def _reader(self):
+        """Grab frames until stopped or the stream fails, retrieving on request."""
+        while self._running:
+            ret = self.cap.grab()
+            frame = None
+            if ret and self._wanted:
+                ret, frame = self.cap.retrieve()
+            with self._cond:
+                if not ret:
+                    self._failed = True
+                    self._cond.notify_all()
+                    return
+                self.frames_read += 1
+                if frame is not None:
+                    self._latest = frame
+                    self._wanted = False
+                    self._cond.notify_all()
+
+    def read(self, timeout: float = 1.0) -> tuple[bool, Optional[np.ndarray]]:
+        """
+        Retrieve the next frame the reader grabs.
+
+        Blocks for at most one frame interval on a healthy stream.
+
+        Args:
+            timeout: Max seconds to wait for a frame
+
+        Returns:
+            Tuple of (ok, frame) where ok is False once the stream has failed,
+            and frame is None if no frame arrived within the timeout
+        """
+        with self._cond:
+            self._wanted = True
+            self._cond.wait_for(
+                lambda: self._latest is not None or self._failed, timeout
+            )
+            frame, self._latest = self._latest, None
+            return not self._failed, frame
+
+    def stop(self, timeout: float = 15.0):
+        """
+        Stop the reader thread.
+
+        Waits for the in-flight cap.grab() to return so the capture can be
+        released safely afterwards.
+
+        Args:
+            timeout: Max seconds to wait for the thread to exit
+        """
+        self._running = False
+        self._thread.join(timeout=timeout)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Fused YOLO input preprocessing for CPU inference.
+
+bgr_to_model_input() turns an already-resized BGR uint8 frame into the
+normalized RGB CHW float32 layout YOLO expects, writing straight into a
+preallocated input tensor in a single pass over the pixels (instead of
+separate flip, transpose, dtype conversion and /255 passes). It is compiled
+to parallel native code with Numba when available, and falls back to an
+equivalent single NumPy ufunc call otherwise (Numba is optional).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _bgr_to_model_input_loop(frame, out):
+    """Parallel loop version, compiled by Numba."""
+    height, width = frame.shape[0], frame.shape[1]
+    scale = np.float32(1.0 / 255.0)
+    for y in prange(height):
+        for x in range(width):
+            out[0, y, x] = frame[y, x, 2] * scale
+            out[1, y, x] = frame[y, x, 1] * scale
+            out[2, y, x] = frame[y, x, 0] * scale
+
+
+def _bgr_to_model_input_numpy(frame, out):
+    """Single ufunc version, used when Numba is not installed."""
+    np.multiply(
+        frame[..., ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0), out=out
+    )
+
+
+if njit is not None:
+    _bgr_to_model_input = njit(cache=True, fastmath=True, parallel=True)(
+        _bgr_to_model_input_loop
+    )
+else:
+    _bgr_to_model_input = _bgr_to_model_input_numpy
+
+
+def bgr_to_model_input(frame: np.ndarray, out: np.ndarray):
+    """
+    Write a BGR frame into a YOLO input slot as normalized RGB CHW float32.
+
+    Args:
+        frame: BGR uint8 frame of shape (H, W, 3), already resized
+        out: Preallocated float32 array of shape (3, H, W), written in place
+    """
+    _bgr_to_model_input(frame, out)
+
+
+def warmup():
+    """Compile bgr_to_model_input() before the first frame (no-op without Numba)."""
+    bgr_to_model_input(
+        np.zeros((1, 1, 3), dtype=np.uint8), np.zeros((3, 1, 1), dtype=np.float32)
+    )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Bounding box filtering for the doorstep region of interest (ROI).
+
+filter_boxes() checks which YOLO boxes are confident enough and have their
+center inside the ROI, given in pixels (see roi_to_pixels(), computed once per
+frame size instead of normalizing every box). It is compiled to native code with Numba
+when available, and falls back to an equivalent vectorized NumPy version
+otherwise (Numba is optional).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _filter_boxes_loop(data, conf_threshold, x_min, x_max, y_min, y_max):
+    """Scalar loop version, compiled by Numba."""
+    mask = np.zeros(data.shape[0], dtype=np.bool_)
+    for i in range(data.shape[0]):
+        if data[i, 4] <= conf_threshold:
+            continue
+        # Center of the bounding box in pixels
+        center_x = (data[i, 0] + data[i, 2]) * 0.5
+        center_y = (data[i, 1] + data[i, 3]) * 0.5
+        mask[i] = x_min <= center_x <= x_max and y_min <= center_y <= y_max
+    return mask
+
+
+def _filter_boxes_numpy(data, conf_threshold, x_min, x_max, y_min, y_max):
+    """Vectorized NumPy version, used when Numba is not installed."""
+    center_x = (data[:, 0] + data[:, 2]) * 0.5
+    center_y = (data[:, 1] + data[:, 3]) * 0.5
+    return (
+        (data[:, 4] > conf_threshold)
+        & (center_x >= x_min) & (center_x <= x_max)
+        & (center_y >= y_min) & (center_y <= y_max)
+    )
+
+
+if njit is not None:
+    _filter_boxes = njit(cache=True, fastmath=True)(_filter_boxes_loop)
+else:
+    _filter_boxes = _filter_boxes_numpy
+
+
+def roi_to_pixels(
+    frame_width: int,
+    frame_height: int,
+    x_min: float,
+    x_max: float,
+    y_min: float,
+    y_max: float,
+) -> tuple[float, float, float, float]:
+    """
+    Convert normalized ROI bounds to pixel bounds for one frame size.
+
+    Args:
+        frame_width: Frame width in pixels
+        frame_height: Frame height in pixels
+        x_min, x_max, y_min, y_max: ROI bounds, normalized to 0.0-1.0
+
+    Returns:
+        Tuple of (x_min, x_max, y_min, y_max) in pixels
+    """
+    return (
+        x_min * frame_width,
+        x_max * frame_width,
+        y_min * frame_height,
+        y_max * frame_height,
+    )
+
+
+def filter_boxes(
+    data: np.ndarray,
+    conf_threshold: float,
+    roi_px: tuple[float, float, float, float],
+) -> np.ndarray:
+    """
+    Find boxes above the confidence threshold whose center lies in the ROI.
+
+    Args:
+        data: Array of shape (N, 6) with rows of (x1, y1, x2, y2, conf, cls)
+        conf_threshold: Minimum confidence (exclusive)
+        roi_px: ROI bounds (x_min, x_max, y_min, y_max) in pixels,
+                from roi_to_pixels()
+
+    Returns:
+        Boolean mask of shape (N,)
+    """
+    x_min, x_max, y_min, y_max = roi_px
+    return _filter_boxes(
+        np.ascontiguousarray(data, dtype=np.float32),
+        float(conf_threshold),
+        float(x_min),
+        float(x_max),
+        float(y_min),
+        float(y_max),
+    )
+
+
+def warmup():
+    """Compile filter_boxes() ahead of the first real frame (no-op without Numba)."""
+    filter_boxes(np.zeros((1, 6), dtype=np.float32), 0, (0, 1, 0, 1))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+DoorBird RTSP stream setup shared by the detector and the connection test.
+
+Builds the stream URL and opens it with OpenCV, either through the default
+FFmpeg backend or through a GStreamer pipeline with a hardware H.264 decoder.
+"""
+
+import os
+from typing import Optional
+
+import cv2
+
+# FFmpeg demuxer options for RTSP: TCP transport (the default is UDP, which
+# drops packets and corrupts frames) and no demuxer-side packet buffering (so
+# the stream open and each frame aren't held back for buffered packets).
+# No socket timeout here: the option is "timeout" on FFmpeg 5+ but
+# "stimeout" on 4.x, where "timeout" is a listen timeout that switches the
+# demuxer into server mode. The open/read timeouts below cover it instead.
+# Only applied if the environment does not already set its own options.
+FFMPEG_RTSP_OPTIONS = "rtsp_transport;tcp|fflags;nobuffer"
+
+
+def build_rtsp_url(user: str, password: str, ip: str) -> str:
+    """
+    Build the DoorBird live video RTSP URL.
+
+    Args:
+        user: DoorBird API username
+        password: DoorBird API password
+        ip: DoorBird IP address
+
+    Returns:
+        RTSP URL with embedded credentials
+    """
+    return f"rtsp://{user}:{password}@{ip}/mpeg/media.amp"
+
+
+def gstreamer_pipeline(url: str, decoder: str) -> str:
+    """
+    Build an appsink pipeline that keeps only the newest decoded frame.
+
+    Args:
+        url: RTSP URL
+        decoder: GStreamer H.264 decoder element (e.g. nvv4l2decoder,
+                 vaapih264dec, avdec_h264)
+
+    Returns:
+        GStreamer pipeline string for cv2.VideoCapture(..., cv2.CAP_GSTREAMER)
+    """
+    if decoder == "nvv4l2decoder":
+        # Jetson: NVDEC decode, nvvidconv copies out of NVMM memory
+        convert = "nvv4l2decoder ! nvvidconv ! video/x-raw,format=BGRx ! videoconvert"
+    else:
+        convert = f"{decoder} ! videoconvert"
+    return (
+        f"rtspsrc location={url} latency=50 ! rtph264depay ! h264parse ! "
+        f"{convert} ! video/x-raw,format=BGR ! appsink drop=1 max-buffers=1"
+    )
+
+
+def connect_to_stream(url: str, gst_decoder: Optional[str] = None) -> cv2.VideoCapture:
+    """
+    Connect to the RTSP stream with optimized settings.
+
+    Args:
+        url: RTSP URL
+        gst_decoder: Optional GStreamer H.264 decoder element; None uses
+                     OpenCV's FFmpeg backend
+
+    Returns:
+        cv2.VideoCapture (check isOpened() before reading)
+    """
+    if gst_decoder:
+        # Hardware decode via GStreamer (appsink already drops stale frames)
+        return cv2.VideoCapture(gstreamer_pipeline(url, gst_decoder), cv2.CAP_GSTREAMER)
+
+    # Set RTSP transport protocol to TCP (more reliable than UDP); read by
+    # OpenCV's FFmpeg backend when the capture is opened
+    os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_RTSP_OPTIONS)
+
+    # Timeouts only take effect as open-time parameters (cap.set() after
+    # opening is ignored by the FFmpeg backend)
+    cap = cv2.VideoCapture(
+        url,
+        cv2.CAP_FFMPEG,
+        [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 10000,  # 10 second connection timeout
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, 10000,  # 10 second read timeout
+        ],
+    )
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer to minimize delay
+    return cap
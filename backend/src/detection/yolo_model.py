@@ -0,0 +1,935 @@
+#!/usr/bin/env python3
+"""
+YOLO model loading with hardware-specific inference backends.
+
+Picks the fastest available runtime for YOLOv8n person detection:
+- NVIDIA GPU: TensorRT FP16 (or INT8-calibrated) engine, exported once from
+  the .pt weights, or an FP16 channels_last PyTorch model when TensorRT is not installed
+- CPU with OpenVINO installed: INT8-quantized OpenVINO model
+- CPU with ONNX Runtime installed and a calibrated model on disk: statically
+  quantized INT8 ONNX model (see export_onnx_int8())
+- CPU with DeepSparse installed: ONNX model run by the DeepSparse engine
+- Otherwise: PyTorch .pt weights (CPU)
+
+Frames are downscaled to one fixed input size (YOLO_IMGSZ by default, see
+imgsz_for_width() for smaller ones) before inference,
+and the loader pins the inference arguments on the model (imgsz, half,
+device). The ultralytics predictor is built once with those arguments and then
+driven directly (PredictorYOLO), so calls skip the library's own resize,
+per-call argument parsing and data loader setup, and never trigger a TensorRT
+engine rebuild.
+"""
+
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+import torch
+from ultralytics import YOLO
+from ultralytics.engine.results import Results
+from ultralytics.utils.nms import non_max_suppression
+
+from backend.src.detection import preprocess
+
+YOLO_WEIGHTS = "yolov8n.pt"  # Will download on first run (~6MB)
+YOLO_ENGINE = "yolov8n.engine"
+YOLO_INT8_ENGINE = "yolov8n_int8.engine"
+YOLO_INT8_CALIBRATION_DATA = "coco128.yaml"  # Downloaded by ultralytics on first export
+YOLO_ONNX = "yolov8n.onnx"
+YOLO_OPENVINO_INT8 = "yolov8n_int8_openvino_model"  # Directory written by ultralytics
+# Calibrated on DoorBird frames, see export_onnx_int8()
+YOLO_ONNX_INT8 = "yolov8n_int8.onnx"
+YOLO_IMGSZ = (384, 640)  # Fixed (height, width) inference size for 16:9 frames
+YOLO_MAX_BATCH = 4  # Largest frame batch the TensorRT engine accepts
+# Frames whose aspect ratio is within this factor of imgsz's are stretched to
+# it (1920x1080 -> 640x384 is 1.07x); others are letterboxed like ultralytics
+YOLO_MAX_STRETCH = 1.1
+LETTERBOX_COLOR = 114  # Gray padding value ultralytics letterboxes with
+
+
+def imgsz_for_width(width: int) -> tuple[int, int]:
+    """
+    Get the 16:9 inference size for a given input width.
+
+    YOLO needs both sides to be multiples of the 32px model stride, so the
+    height is rounded up (640 -> 384, 320 -> 192, 160 -> 96).
+
+    Args:
+        width: Inference width in pixels (multiple of 32)
+
+    Returns:
+        Tuple of (height, width)
+    """
+    stride = 32
+    height = -(-width * 9 // (16 * stride)) * stride
+    return height, width
+
+
+def export_tensorrt_engine(
+    weights: str = YOLO_WEIGHTS,
+    imgsz: tuple[int, int] = YOLO_IMGSZ,
+    batch: int = YOLO_MAX_BATCH,
+    int8: bool = False,
+) -> str:
+    """
+    Export YOLO weights to a TensorRT FP16 or INT8 engine.
+
+    This is a one-time step (takes a few minutes) that must run on the same
+    GPU / TensorRT version that will later load the engine. INT8 export runs
+    post-training calibration on YOLO_INT8_CALIBRATION_DATA, and is saved as
+    YOLO_INT8_ENGINE so it can live next to the FP16 engine.
+
+    Args:
+        weights: Path to the PyTorch .pt weights
+        imgsz: Fixed (height, width) input size the engine is built for
+        batch: Maximum number of frames per inference call
+        int8: Build an INT8-calibrated engine instead of FP16
+
+    Returns:
+        Path to the exported .engine file
+    """
+    model = YOLO(weights)
+    precision = (
+        {"int8": True, "data": YOLO_INT8_CALIBRATION_DATA} if int8 else {"half": True}
+    )
+    engine = model.export(
+        format="engine",
+        imgsz=imgsz,
+        dynamic=True,  # Any batch size from 1 to `batch`
+        batch=batch,
+        device=0,
+        workspace=4,
+        **precision,
+    )
+    if int8:
+        engine = str(Path(engine).rename(YOLO_INT8_ENGINE))
+    return engine
+
+
+def load_openvino_model(
+    weights: str = YOLO_WEIGHTS,
+    model_dir: str = YOLO_OPENVINO_INT8,
+    imgsz: tuple[int, int] = YOLO_IMGSZ,
+) -> "PredictorYOLO":
+    """
+    Load YOLO as an INT8 OpenVINO model, exporting it first if needed.
+
+    The one-time export quantizes the weights with NNCF post-training
+    calibration on YOLO_INT8_CALIBRATION_DATA.
+
+    Args:
+        weights: Path to the PyTorch .pt weights
+        model_dir: Path to the exported OpenVINO model directory
+        imgsz: Fixed (height, width) input size
+
+    Returns:
+        PredictorYOLO running on the OpenVINO CPU runtime
+    """
+    if not Path(model_dir).exists():
+        print(
+            f"⚙️  Exporting OpenVINO INT8 model to {model_dir} "
+            "(one-time, may take minutes)..."
+        )
+        model_dir = YOLO(weights).export(
+            format="openvino",
+            int8=True,
+            data=YOLO_INT8_CALIBRATION_DATA,
+            imgsz=imgsz,
+            dynamic=True,  # Any batch size
+        )
+
+    model = YOLO(model_dir, task="detect")
+    model.overrides["imgsz"] = imgsz
+    return PredictorYOLO(model, imgsz, backend="OpenVINO INT8 (CPU)")
+
+
+class DeepSparseYOLO:
+    """
+    DeepSparse-backed YOLO detector with the same call interface as `YOLO`.
+
+    Runs the exported ONNX model through Neural Magic's DeepSparse engine
+    (AVX2/AVX-512 optimized) and wraps its output in ultralytics `Results`
+    objects, so callers can keep iterating `result.boxes` as usual.
+    """
+
+    def __init__(
+        self, onnx_path: str, names: dict, imgsz: tuple[int, int] = YOLO_IMGSZ
+    ):
+        """
+        Initialize the DeepSparse pipeline.
+
+        Args:
+            onnx_path: Path to the exported ONNX model
+            names: YOLO class id -> class name mapping
+            imgsz: (height, width) input size the ONNX model was exported with
+        """
+        from deepsparse import Pipeline
+
+        self.pipeline = Pipeline.create(
+            task="yolov8", model_path=onnx_path, image_size=imgsz
+        )
+        self.names = names
+        self.imgsz = imgsz
+        self.backend = "DeepSparse (CPU)"
+
+    def __call__(
+        self,
+        source: Union[np.ndarray, list[np.ndarray]],
+        verbose: bool = False,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        classes: Optional[list[int]] = None,
+        max_det: int = 300,
+        **kwargs,
+    ) -> list[Results]:
+        """
+        Run detection on one frame or a list of frames.
+
+        Args:
+            source: BGR frame or list of BGR frames
+            verbose: Unused, kept for YOLO call compatibility
+            conf: Minimum confidence for detections
+            iou: NMS IoU threshold
+            classes: Optional list of class ids to keep
+            max_det: Maximum detections per frame (highest scores kept)
+
+        Returns:
+            List of ultralytics Results, one per frame
+        """
+        frames = source if isinstance(source, list) else [source]
+        output = self.pipeline(images=frames, conf_thres=conf, iou_thres=iou)
+
+        results = []
+        for frame, boxes, scores, labels in zip(
+            frames, output.boxes, output.scores, output.labels, strict=True
+        ):
+            # Rows of (x1, y1, x2, y2, conf, cls) like ultralytics `boxes.data`
+            data = np.array(
+                [
+                    [*box, score, float(label)]
+                    for box, score, label in zip(boxes, scores, labels, strict=True)
+                ],
+                dtype=np.float32,
+            ).reshape(-1, 6)
+            if classes is not None:
+                data = data[np.isin(data[:, 5], classes)]
+            # Highest-scoring boxes first, capped like the NMS-based backends
+            data = data[np.argsort(-data[:, 4], kind="stable")[:max_det]]
+            results.append(
+                Results(frame, path="", names=self.names, boxes=torch.from_numpy(data))
+            )
+        return results
+
+
+class CudaYOLO:
+    """
+    FP16 channels_last PyTorch YOLO on CUDA with the same call interface as `YOLO`.
+
+    Bypasses the ultralytics predictor: frames are copied into a pinned host
+    staging buffer, uploaded with a non-blocking copy, and converted to
+    normalized NHWC (channels_last) FP16 on the GPU, which is the layout
+    cuDNN's FP16 conv kernels are fastest with. All GPU work is queued on a
+    dedicated CUDA stream, so it never serializes with other work on the
+    default stream. The forward pass is captured once per batch size as a
+    CUDA graph and replayed for every call, so a single graph launch
+    replaces the dozens of short kernel launches YOLOv8n needs per frame.
+    """
+
+    def __init__(
+        self, weights: str = YOLO_WEIGHTS, imgsz: tuple[int, int] = YOLO_IMGSZ
+    ):
+        """
+        Load the weights onto the GPU.
+
+        Args:
+            weights: Path to the PyTorch .pt weights
+            imgsz: (height, width) frames are resized to before inference
+        """
+        yolo = YOLO(weights)
+        self.names = yolo.names
+        self.backend = "PyTorch FP16 CUDA graph (GPU)"
+        self.imgsz = imgsz
+        self.net = (
+            yolo.model.fuse()
+            .to("cuda")
+            .half()
+            .eval()
+            .to(memory_format=torch.channels_last)
+        )
+        self._staging: Optional[torch.Tensor] = None
+        self.stream = torch.cuda.Stream()
+        # Batch size -> (graph, static input, static output)
+        self._graphs: dict[int, tuple] = {}
+
+    def _staging_buffer(self, batch: int) -> torch.Tensor:
+        """Pinned uint8 NHWC host buffer for `batch` frames, reused across calls."""
+        if self._staging is None or self._staging.shape[0] != batch:
+            height, width = self.imgsz
+            self._staging = torch.empty(
+                (batch, height, width, 3), dtype=torch.uint8, pin_memory=True
+            )
+        return self._staging
+
+    def _cuda_graph(self, batch: int) -> tuple:
+        """
+        Capture the forward pass for `batch` frames as a CUDA graph (once).
+
+        Must be called on self.stream. Every replay reads the static input
+        tensor and overwrites the static output tensors in place.
+
+        Args:
+            batch: Number of frames per call
+
+        Returns:
+            Tuple of (graph, static input, static output)
+        """
+        if batch not in self._graphs:
+            height, width = self.imgsz
+            static_in = torch.zeros(
+                (batch, 3, height, width), device="cuda", dtype=torch.float16
+            ).contiguous(memory_format=torch.channels_last)
+
+            # Warm up so cuDNN autotuning and allocations happen before capture
+            for _ in range(3):
+                self.net(static_in)
+            self.stream.synchronize()
+
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph, stream=self.stream):
+                static_out = self.net(static_in)
+            self._graphs[batch] = (graph, static_in, static_out)
+        return self._graphs[batch]
+
+    def __call__(
+        self,
+        source: Union[np.ndarray, list[np.ndarray]],
+        verbose: bool = False,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        classes: Optional[list[int]] = None,
+        max_det: int = 300,
+        **kwargs,
+    ) -> list[Results]:
+        """
+        Run detection on one frame or a list of frames.
+
+        Args:
+            source: BGR frame or list of BGR frames, already resized to imgsz
+            verbose: Unused, kept for YOLO call compatibility
+            conf: Minimum confidence for detections
+            iou: NMS IoU threshold
+            classes: Optional list of class ids to keep
+            max_det: Maximum detections per frame
+
+        Returns:
+            List of ultralytics Results, one per frame
+        """
+        frames = source if isinstance(source, list) else [source]
+
+        staging = self._staging_buffer(len(frames))
+        for i, frame in enumerate(frames):
+            np.copyto(staging[i].numpy(), frame)
+
+        with torch.cuda.stream(self.stream):
+            graph, static_in, static_out = self._cuda_graph(len(frames))
+
+            # Upload uint8 frames, then BGR->RGB, NHWC->NCHW view (memory stays
+            # channels_last) and normalize into the graph's input, all on the GPU
+            x = staging.to("cuda", non_blocking=True)
+            static_in.copy_(x.flip(-1).permute(0, 3, 1, 2)).div_(255)
+
+            graph.replay()
+            preds = static_out
+            detections = non_max_suppression(
+                preds, conf, iou, classes=classes, max_det=max_det
+            )
+        # Boxes are read on the default stream, and the staging buffer is
+        # refilled on the next call, so wait for this stream to finish first
+        self.stream.synchronize()
+        return [
+            Results(frame, path="", names=self.names, boxes=boxes)
+            for frame, boxes in zip(frames, detections, strict=True)
+        ]
+
+
+class PredictorYOLO:
+    """
+    Ultralytics YOLO (.pt or TensorRT engine) driven through one persistent predictor.
+
+    `YOLO.__call__` goes through `Model.predict()`, which re-merges and
+    re-validates every argument and sets up a new data loader and letterbox
+    for each call. This wrapper builds the predictor once with a warmup call,
+    then feeds frames that are already resized to imgsz straight into
+    `predictor.inference()` and runs NMS itself. The host and device input
+    tensors are allocated once per batch size and refilled in place; on CPU
+    the frames are written straight into the float32 input in one fused pass.
+    """
+
+    def __init__(
+        self,
+        model: YOLO,
+        imgsz: tuple[int, int] = YOLO_IMGSZ,
+        backend: str = "PyTorch (CPU)",
+    ):
+        """
+        Build the predictor with a warmup call.
+
+        Args:
+            model: YOLO model with its inference arguments pinned in overrides
+            imgsz: (height, width) frames are resized to before inference
+            backend: Human-readable runtime description for logs
+        """
+        height, width = imgsz
+        model(np.zeros((height, width, 3), dtype=np.uint8), verbose=False)
+        preprocess.warmup()
+
+        self.yolo = model
+        self.names = model.names
+        self.imgsz = imgsz
+        self.backend = backend
+        self.predictor = model.predictor
+        # Batch size -> (uint8 NCHW host buffer, normalized device tensor)
+        self._inputs: dict[int, tuple[np.ndarray, torch.Tensor]] = {}
+
+    def _input_buffers(self, batch: int) -> tuple[np.ndarray, torch.Tensor]:
+        """Host and device input tensors for `batch` frames, reused across calls."""
+        if batch not in self._inputs:
+            height, width = self.imgsz
+            host = np.empty((batch, 3, height, width), dtype=np.uint8)
+            device = torch.empty(
+                host.shape,
+                dtype=torch.float16 if self.predictor.model.fp16 else torch.float32,
+                device=self.predictor.device,
+            )
+            self._inputs[batch] = (host, device)
+        return self._inputs[batch]
+
+    def __call__(
+        self,
+        source: Union[np.ndarray, list[np.ndarray]],
+        verbose: bool = False,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        classes: Optional[list[int]] = None,
+        max_det: int = 300,
+        **kwargs,
+    ) -> list[Results]:
+        """
+        Run detection on one frame or a list of frames.
+
+        Args:
+            source: BGR frame or list of BGR frames, already resized to imgsz
+            verbose: Unused, kept for YOLO call compatibility
+            conf: Minimum confidence for detections
+            iou: NMS IoU threshold
+            classes: Optional list of class ids to keep
+            max_det: Maximum detections per frame
+
+        Returns:
+            List of ultralytics Results, one per frame
+        """
+        frames = source if isinstance(source, list) else [source]
+        predictor = self.predictor
+
+        host, im = self._input_buffers(len(frames))
+        if im.device.type == "cpu" and im.dtype == torch.float32:
+            # BGR -> RGB, HWC -> CHW and /255 in a single pass, written
+            # straight into the model input
+            im_array = im.numpy()
+            for i, frame in enumerate(frames):
+                preprocess.bgr_to_model_input(frame, im_array[i])
+        else:
+            # BGR -> RGB and HWC -> CHW straight into the host buffer, then
+            # convert and normalize into the device tensor in place
+            for i, frame in enumerate(frames):
+                np.copyto(host[i], frame[..., ::-1].transpose(2, 0, 1))
+            im.copy_(torch.from_numpy(host)).div_(255)
+
+        preds = predictor.inference(im)
+        detections = non_max_suppression(
+            preds, conf, iou, classes=classes, max_det=max_det
+        )
+        return [
+            Results(frame, path="", names=self.names, boxes=boxes)
+            for frame, boxes in zip(frames, detections, strict=True)
+        ]
+
+
+class OnnxRuntimeYOLO:
+    """
+    ONNX Runtime YOLO detector with the same call interface as `YOLO`.
+
+    Runs a (typically INT8-quantized) ONNX model on the best execution
+    provider available (CUDA, CoreML, DirectML, then CPU) and wraps its
+    output in ultralytics `Results` objects.
+    """
+
+    def __init__(
+        self, onnx_path: str, names: dict, imgsz: tuple[int, int] = YOLO_IMGSZ
+    ):
+        """
+        Create the inference session.
+
+        Args:
+            onnx_path: Path to the ONNX model
+            names: YOLO class id -> class name mapping
+            imgsz: (height, width) input size the ONNX model was exported with
+        """
+        import onnxruntime as ort
+
+        preferred = [
+            "CUDAExecutionProvider",
+            "CoreMLExecutionProvider",
+            "DmlExecutionProvider",
+            "CPUExecutionProvider",
+        ]
+        available = ort.get_available_providers()
+        # Use the same intra-op thread budget as Torch (see
+        # set_inference_threads) instead of one thread per core
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = torch.get_num_threads()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            onnx_path,
+            sess_options=options,
+            providers=[p for p in preferred if p in available],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.names = names
+        self.imgsz = imgsz
+        provider = self.session.get_providers()[0].replace("ExecutionProvider", "")
+        self.backend = f"ONNX Runtime INT8 ({provider})"
+        # Batch size -> preallocated float32 NCHW input
+        self._inputs: dict[int, np.ndarray] = {}
+
+    def __call__(
+        self,
+        source: Union[np.ndarray, list[np.ndarray]],
+        verbose: bool = False,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        classes: Optional[list[int]] = None,
+        max_det: int = 300,
+        **kwargs,
+    ) -> list[Results]:
+        """
+        Run detection on one frame or a list of frames.
+
+        Args:
+            source: BGR frame or list of BGR frames, already resized to imgsz
+            verbose: Unused, kept for YOLO call compatibility
+            conf: Minimum confidence for detections
+            iou: NMS IoU threshold
+            classes: Optional list of class ids to keep
+            max_det: Maximum detections per frame
+
+        Returns:
+            List of ultralytics Results, one per frame
+        """
+        frames = source if isinstance(source, list) else [source]
+
+        if len(frames) not in self._inputs:
+            height, width = self.imgsz
+            self._inputs[len(frames)] = np.empty(
+                (len(frames), 3, height, width), dtype=np.float32
+            )
+        im = self._inputs[len(frames)]
+        for i, frame in enumerate(frames):
+            preprocess.bgr_to_model_input(frame, im[i])
+
+        (preds,) = self.session.run(None, {self.input_name: im})
+        detections = non_max_suppression(
+            torch.from_numpy(preds), conf, iou, classes=classes, max_det=max_det
+        )
+        return [
+            Results(frame, path="", names=self.names, boxes=boxes)
+            for frame, boxes in zip(frames, detections, strict=True)
+        ]
+
+
+def export_onnx_int8(
+    calibration_frames: list[np.ndarray],
+    weights: str = YOLO_WEIGHTS,
+    output_path: str = YOLO_ONNX_INT8,
+    imgsz: tuple[int, int] = YOLO_IMGSZ,
+) -> str:
+    """
+    Export YOLO to ONNX and statically quantize it to INT8 with ONNX Runtime.
+
+    Calibrating on frames from the actual camera (rather than a generic
+    dataset) keeps the INT8 activation ranges matched to the doorstep scene.
+
+    Args:
+        calibration_frames: BGR frames from the camera (~100 is plenty)
+        weights: Path to the PyTorch .pt weights
+        output_path: Where to write the quantized model
+        imgsz: Fixed (height, width) input size
+
+    Returns:
+        Path to the quantized ONNX model
+    """
+    from onnxruntime.quantization import QuantType, quantize_static
+
+    height, width = imgsz
+    onnx_path = YOLO(weights).export(
+        format="onnx", opset=13, simplify=True, dynamic=True, imgsz=imgsz
+    )
+
+    class FrameCalibrationReader:
+        """Feeds the calibration frames to ONNX Runtime one at a time."""
+
+        def __init__(self, input_name: str):
+            self.input_name = input_name
+            self.frames = iter(calibration_frames)
+
+        def get_next(self) -> Optional[dict]:
+            frame = next(self.frames, None)
+            if frame is None:
+                return None
+            small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+            im = np.empty((1, 3, height, width), dtype=np.float32)
+            preprocess.bgr_to_model_input(small, im[0])
+            return {self.input_name: im}
+
+    import onnxruntime as ort
+
+    input_name = ort.InferenceSession(onnx_path).get_inputs()[0].name
+    quantize_static(
+        onnx_path,
+        output_path,
+        FrameCalibrationReader(input_name),
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return output_path
+
+
+# Reused downscale targets for detect_boxes_batch(), one per frame in a batch
+_resize_buffers: list[np.ndarray] = []
+
+
+def _resize_buffer(index: int, height: int, width: int) -> np.ndarray:
+    """Preallocated (height, width, 3) uint8 image for batch slot `index`."""
+    while len(_resize_buffers) <= index:
+        _resize_buffers.append(np.empty((height, width, 3), dtype=np.uint8))
+    if _resize_buffers[index].shape != (height, width, 3):
+        _resize_buffers[index] = np.empty((height, width, 3), dtype=np.uint8)
+    return _resize_buffers[index]
+
+
+def _fit_to_input(
+    frame: np.ndarray, index: int, input_height: int, input_width: int
+) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+    """
+    Resize a frame into batch slot `index` at the model input size.
+
+    Frames close to the input aspect ratio are stretched to fill it; others
+    are scaled to fit and padded (letterboxed), so portrait photos are not
+    squashed.
+
+    Args:
+        frame: Full-resolution BGR frame
+        index: Batch slot whose preallocated buffer receives the frame
+        input_height: Model input height
+        input_width: Model input width
+
+    Returns:
+        Tuple of (input image, (scale_x, scale_y, pad_x, pad_y)) where a box
+        coordinate maps back to the frame as (x - pad_x) * scale_x
+    """
+    frame_height, frame_width = frame.shape[:2]
+    buffer = _resize_buffer(index, input_height, input_width)
+    stretch = (frame_width * input_height) / (frame_height * input_width)
+    if 1 / YOLO_MAX_STRETCH <= stretch <= YOLO_MAX_STRETCH:
+        cv2.resize(
+            frame,
+            (input_width, input_height),
+            dst=buffer,
+            interpolation=cv2.INTER_LINEAR,
+        )
+        return buffer, (frame_width / input_width, frame_height / input_height, 0, 0)
+
+    scale = min(input_width / frame_width, input_height / frame_height)
+    width = max(1, round(frame_width * scale))
+    height = max(1, round(frame_height * scale))
+    pad_x = (input_width - width) // 2
+    pad_y = (input_height - height) // 2
+    buffer.fill(LETTERBOX_COLOR)
+    cv2.resize(
+        frame,
+        (width, height),
+        dst=buffer[pad_y:pad_y + height, pad_x:pad_x + width],
+        interpolation=cv2.INTER_LINEAR,
+    )
+    return buffer, (frame_width / width, frame_height / height, pad_x, pad_y)
+
+
+# Any model returned by load_yolo_model()
+DetectorModel = Union[PredictorYOLO, DeepSparseYOLO, CudaYOLO, OnnxRuntimeYOLO]
+
+
+def load_deepsparse_model(
+    weights: str = YOLO_WEIGHTS,
+    onnx_path: str = YOLO_ONNX,
+    imgsz: tuple[int, int] = YOLO_IMGSZ,
+) -> DeepSparseYOLO:
+    """
+    Load YOLO on the DeepSparse CPU runtime, exporting to ONNX if needed.
+
+    Args:
+        weights: Path to the PyTorch .pt weights
+        onnx_path: Path to the ONNX model
+        imgsz: Fixed (height, width) input size
+
+    Returns:
+        DeepSparseYOLO detector
+    """
+    model = YOLO(weights)
+    if not Path(onnx_path).exists():
+        print(f"⚙️  Exporting ONNX model to {onnx_path}...")
+        onnx_path = model.export(format="onnx", opset=12, imgsz=imgsz)
+    return DeepSparseYOLO(onnx_path, model.names, imgsz)
+
+
+def load_yolo_model(
+    weights: str = YOLO_WEIGHTS,
+    engine: Optional[str] = None,
+    imgsz: tuple[int, int] = YOLO_IMGSZ,
+    int8: bool = False,
+) -> DetectorModel:
+    """
+    Load YOLO with the fastest backend available on this host.
+
+    On CUDA hosts the TensorRT engine is loaded (and exported first if it does
+    not exist yet); without TensorRT the .pt weights run as a CudaYOLO.
+    CPU-only hosts use an INT8 OpenVINO model when OpenVINO is installed,
+    then the camera-calibrated INT8 ONNX model when ONNX Runtime is installed
+    and the model has been exported, then DeepSparse when it is installed,
+    and fall back to the plain .pt weights otherwise.
+
+    Args:
+        weights: Path to the PyTorch .pt weights
+        engine: Path to the TensorRT engine (default: YOLO_ENGINE, or
+                YOLO_INT8_ENGINE when int8 is set)
+        imgsz: Fixed (height, width) inference size
+        int8: Use an INT8-calibrated TensorRT engine instead of FP16
+
+    Returns:
+        YOLO model ready for `model(frame, verbose=False)` calls
+    """
+    if not torch.cuda.is_available():
+        try:
+            import openvino  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            return load_openvino_model(weights, imgsz=imgsz)
+
+        if Path(YOLO_ONNX_INT8).exists():
+            try:
+                import onnxruntime  # noqa: F401
+            except ImportError:
+                pass
+            else:
+                return OnnxRuntimeYOLO(YOLO_ONNX_INT8, YOLO(weights).names, imgsz)
+
+        try:
+            import deepsparse  # noqa: F401
+        except ImportError:
+            model = YOLO(weights)
+            model.overrides["imgsz"] = imgsz
+            return PredictorYOLO(model, imgsz)
+        return load_deepsparse_model(weights, imgsz=imgsz)
+
+    # Let cuDNN pick the fastest FP16 conv algorithms for our fixed input shape
+    torch.backends.cudnn.benchmark = True
+
+    try:
+        import tensorrt  # noqa: F401
+    except ImportError:
+        return CudaYOLO(weights, imgsz)
+
+    if engine is None:
+        engine = YOLO_INT8_ENGINE if int8 else YOLO_ENGINE
+    precision = "INT8" if int8 else "FP16"
+    if not Path(engine).exists():
+        print(
+            f"⚙️  Exporting TensorRT {precision} engine to {engine} "
+            "(one-time, may take minutes)..."
+        )
+        engine = export_tensorrt_engine(weights, imgsz, int8=int8)
+
+    model = YOLO(engine, task="detect")
+    # Pin fixed-shape FP16 GPU inference for every call
+    model.overrides.update({"imgsz": imgsz, "half": True, "device": 0})
+    return PredictorYOLO(model, imgsz, backend=f"TensorRT {precision} (GPU)")
+
+
+def set_inference_threads(num_threads: int):
+    """
+    Cap the CPU threads used for inference and image processing.
+
+    Torch defaults to one thread per core, so each once-per-interval YOLO
+    call briefly saturates every core and evicts the RTSP reader's cache.
+    OpenCV's own thread pool is disabled so it doesn't fight Torch's.
+    Call before load_yolo_model() so an ONNX Runtime session picks up the
+    same limit.
+
+    Args:
+        num_threads: Torch intra-op threads for YOLO inference
+    """
+    torch.set_num_threads(num_threads)
+    cv2.setNumThreads(1)
+
+
+def run_inference(
+    model: DetectorModel,
+    source: Union[np.ndarray, list[np.ndarray]],
+    **kwargs,
+) -> list[Results]:
+    """
+    Run YOLO on a frame with the fastest numerics for this host.
+
+    On CUDA the forward pass runs under FP16 autocast so any op not already
+    in half precision still dispatches to Tensor Cores. CudaYOLO is skipped:
+    its network is already FP16, and capturing its CUDA graph under autocast
+    would bake autocast's cached weight casts into the graph.
+
+    Args:
+        model: Model returned by load_yolo_model()
+        source: BGR frame (or list of frames)
+        **kwargs: Extra YOLO predict arguments (conf, classes, ...)
+
+    Returns:
+        List of ultralytics Results
+    """
+    autocast = (
+        torch.autocast("cuda", dtype=torch.float16)
+        if torch.cuda.is_available() and not isinstance(model, CudaYOLO)
+        else nullcontext()
+    )
+    with torch.inference_mode(), autocast:
+        return model(source, verbose=False, **kwargs)
+
+
+def boxes_to_array(results: list[Results]) -> np.ndarray:
+    """
+    Pull all YOLO boxes off the inference device in one copy.
+
+    The per-result tensors are concatenated on the device first, so a whole
+    batch costs a single device -> host sync.
+
+    Args:
+        results: Results list returned by a YOLO call
+
+    Returns:
+        Float array of shape (N, 6) with rows of (x1, y1, x2, y2, conf, cls)
+    """
+    if not results:
+        return np.empty((0, 6), dtype=np.float32)
+    return torch.cat([result.boxes.data for result in results]).cpu().numpy()
+
+
+def detect_boxes_batch(
+    model: DetectorModel, frames: list[np.ndarray], **kwargs
+) -> list[np.ndarray]:
+    """
+    Run YOLO on downscaled copies of several frames in one batched call.
+
+    Each frame is resized once to the model's imgsz (letterboxed if its aspect
+    ratio differs, see _fit_to_input), so the library does no resize of its
+    own, and the returned boxes are mapped back to each original frame so
+    crops and blurs can use full-resolution pixels. More than
+    YOLO_MAX_BATCH frames are split into several calls (the TensorRT engine
+    accepts no larger batch).
+
+    Args:
+        model: Model returned by load_yolo_model()
+        frames: Full-resolution BGR frames
+        **kwargs: Extra YOLO predict arguments (conf, classes, ...)
+
+    Returns:
+        One float array per frame, each of shape (N, 6) with rows of
+        (x1, y1, x2, y2, conf, cls) in original frame coordinates
+    """
+    if len(frames) > YOLO_MAX_BATCH:
+        return [
+            data
+            for start in range(0, len(frames), YOLO_MAX_BATCH)
+            for data in detect_boxes_batch(
+                model, frames[start:start + YOLO_MAX_BATCH], **kwargs
+            )
+        ]
+
+    if not frames:
+        return []
+
+    input_height, input_width = model.imgsz
+
+    # Resize into preallocated buffers (overwritten on the next call; only the
+    # boxes leave this function)
+    small_frames, transforms = zip(*(
+        _fit_to_input(frame, i, input_height, input_width)
+        for i, frame in enumerate(frames)
+    ), strict=True)
+    results = run_inference(model, list(small_frames), **kwargs)
+
+    # One device -> host copy for the whole batch, then split per frame
+    counts = [len(result.boxes) for result in results]
+    all_data = boxes_to_array(results)
+
+    batch_data = []
+    for frame, (scale_x, scale_y, pad_x, pad_y), data in zip(
+        frames, transforms, np.split(all_data, np.cumsum(counts)[:-1]), strict=True
+    ):
+        # Map boxes back to the full-resolution frame
+        frame_height, frame_width = frame.shape[:2]
+        data[:, :4] -= (pad_x, pad_y, pad_x, pad_y)
+        data[:, :4] *= (scale_x, scale_y, scale_x, scale_y)
+        # Keep boxes inside the frame so they can be used as slices directly
+        # (x1, x2 and y1, y2 are strided views, clipped in place)
+        np.clip(data[:, 0:4:2], 0, frame_width, out=data[:, 0:4:2])
+        np.clip(data[:, 1:4:2], 0, frame_height, out=data[:, 1:4:2])
+        batch_data.append(data)
+    return batch_data
+
+
+def detect_boxes(
+    model: DetectorModel, frame: np.ndarray, **kwargs
+) -> np.ndarray:
+    """
+    Run YOLO on a downscaled copy of a single frame.
+
+    Args:
+        model: Model returned by load_yolo_model()
+        frame: Full-resolution BGR frame
+        **kwargs: Extra YOLO predict arguments (conf, classes, ...)
+
+    Returns:
+        Float array of shape (N, 6) with rows of (x1, y1, x2, y2, conf, cls)
+        in original frame coordinates
+    """
+    return detect_boxes_batch(model, [frame], **kwargs)[0]
+
+
+def warmup_model(model: DetectorModel, runs: int = 2, batch: int = 1):
+    """
+    Run a few detections on blank frames so the first real batch is not slow.
+
+    The first calls pay one-time costs (CUDA context and cuDNN algorithm
+    selection, CUDA graph capture, input buffer allocation, lazy session and
+    kernel initialization), often 10x or more the steady-state latency. Most
+    of these are per batch size, so warm up with the batch size the caller
+    will run.
+
+    Args:
+        model: Model returned by load_yolo_model()
+        runs: Number of warmup detections
+        batch: Frames per warmup detection
+    """
+    height, width = model.imgsz
+    frames = [np.zeros((height, width, 3), dtype=np.uint8)] * batch
+    for _ in range(runs):
+        detect_boxes_batch(model, frames)
@@ -12,177 +12,204 @@ DUAL-PASS DETECTION:
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import cv2
+import numpy as np
 from dotenv import load_dotenv
-from ultralytics import YOLO
 
 from backend.src.clients.baseten_client import BasetenClient
 from backend.src.clients.supabase_client import SupabaseClient
-from backend.src.costume_detector import detect_people_and_costumes
+from backend.src.costume_detector import (
+    DETECTION_CLASSES,
+    detect_people_and_costumes,
+    encode_crop,
+)
+from backend.src.detection.yolo_model import (
+    YOLO_MAX_BATCH,
+    DetectorModel,
+    detect_boxes_batch,
+    load_yolo_model,
+    warmup_model,
+)
+from backend.src.utils.face_blur import pixelate
 
 # Load environment variables
 load_dotenv()
 
+# Lower YOLO confidence threshold for test images
+CONFIDENCE_THRESHOLD = 0.5
+
+# Test images run through YOLO together in batches of this size (the
+# largest batch the TensorRT engine accepts, so each batch is one call)
+YOLO_BATCH_SIZE = YOLO_MAX_BATCH
+
+# Images classified concurrently (network-bound Baseten calls), while the
+# main thread runs YOLO on the next batch
+PIPELINE_WORKERS = 8
+
 
 def process_test_image(
     image_path: str,
-    model: YOLO,
+    img: np.ndarray,
+    detections: np.ndarray,
+    model: DetectorModel,
     baseten_client: BasetenClient,
-    supabase_client: SupabaseClient,
 ) -> dict:
     """
     Process a single test image through the complete pipeline with dual-pass detection:
-    1. Load image
-    2. PASS 1: Detect standard people (YOLO class 0)
-    3. PASS 2: Detect and validate potential inflatable costumes (classes 2, 14, 16, 17)
-    4. Classify costumes with Baseten
-    5. Upload to Supabase
+    1. PASS 1: Collect standard people (YOLO class 0)
+    2. PASS 2: Validate potential inflatable costumes (classes 2, 14, 16, 17)
+    3. Classify costumes with Baseten
+    4. Blur and save the annotated image locally
 
     Args:
         image_path: Path to test image
-        model: YOLOv8 model
+        img: The loaded test image (BGR)
+        detections: YOLO boxes for this image from detect_boxes_batch(),
+                    already filtered by confidence
+        model: Model returned by load_yolo_model()
         baseten_client: Initialized Baseten client
-        supabase_client: Initialized Supabase client
 
     Returns:
-        Dict with detection results
+        Dict with detection results, including the "detection" record for
+        SupabaseClient.save_detections_batch() (uploaded by the caller)
     """
-    print(f"\n{'='*70}")
-    print(f"Processing: {Path(image_path).name}")
-    print('='*70)
-
-    # Read image
-    img = cv2.imread(image_path)
-    if img is None:
-        print(f"❌ Failed to read image: {image_path}")
-        return None
-
-    height, width = img.shape[:2]
-    print(f"📐 Image dimensions: {width}x{height}")
-
-    # Run YOLO dual-pass detection using shared detector
-    detected_people = detect_people_and_costumes(
-        img,
-        model,
-        baseten_client,
-        confidence_threshold=0.5,  # Lower threshold for test images
-        verbose=True,
-    )
-
-    if not detected_people:
-        print("⚠️  No people or valid costumes detected")
-        return None
-
-    # Process first detection (for single-person test images)
-    person = detected_people[0]
-    bbox = person["bounding_box"]
-    print(f"📦 Using detection: {bbox}")
-
-    # Check if already classified (from inflatable validation)
-    if person.get("costume_classification"):
-        classification = person["costume_classification"]
-        confidence = person["costume_confidence"]
-        description = person["costume_description"]
-        print(f"✅ Costume already classified: {classification} ({confidence:.2f})")
-    else:
-        # Extract person crop from ORIGINAL unblurred image for classification
-        person_crop = img[bbox["y1"]:bbox["y2"], bbox["x1"]:bbox["x2"]]
-
-        # Encode person crop to bytes (for Baseten)
-        _, buffer = cv2.imencode('.jpg', person_crop)
-        image_bytes = buffer.tobytes()
-
-        print("\n🎭 Classifying costume with Baseten...")
-
-        # Classify costume
-        try:
-            classification, confidence, description = baseten_client.classify_costume(
-                image_bytes
-            )
+    # Workers run concurrently, so collect this image's log lines and print
+    # them as one block when it finishes instead of interleaving them (the
+    # shared detector's own per-box prints are turned off for the same reason)
+    lines: list[str] = []
+    log = lines.append
 
-            if classification:
-                print(f"✅ Classification successful!")
-                print(f"   Type:        {classification}")
-                print(f"   Confidence:  {confidence:.2f}")
-                print(f"   Description: {description}")
-            else:
-                print("❌ Classification failed - no results returned")
-                return None
+    try:
+        log(f"\n{'='*70}")
+        log(f"Processing: {Path(image_path).name}")
+        log('='*70)
 
-        except Exception as e:
-            print(f"❌ Baseten API error: {e}")
-            return None
+        height, width = img.shape[:2]
+        log(f"📐 Image dimensions: {width}x{height}")
 
-    # Generate timestamp for this detection (Pacific time)
-    timestamp = datetime.now(ZoneInfo("America/Los_Angeles"))
-
-    # Save processed image locally
-    output_dir = Path("backend/tests/test_detections")
-    output_dir.mkdir(exist_ok=True)
-
-    timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-    output_filename = f"detection_{timestamp_str}_{classification}.jpg"
-    output_path = output_dir / output_filename
-
-    # Now blur the frame for privacy before saving
-    blurred_img = img.copy()
-    x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
-
-    # Extract person region
-    person_region = blurred_img[y1:y2, x1:x2]
-
-    # Apply moderate Gaussian blur (kernel size 33)
-    # This obscures facial features while keeping costume colors/shapes visible
-    if person_region.size > 0:
-        blurred_person = cv2.GaussianBlur(person_region, (33, 33), 0)
-        blurred_img[y1:y2, x1:x2] = blurred_person
-        print(f"🔒 Blurred person for privacy")
-
-    # Draw bounding box on blurred image
-    cv2.rectangle(
-        blurred_img,
-        (x1, y1),
-        (x2, y2),
-        (0, 255, 0),
-        3
-    )
-
-    cv2.imwrite(str(output_path), blurred_img)
-    print(f"\n💾 Saved detection locally: {output_path}")
-
-    # Upload to Supabase
-    print("\n📤 Uploading to Supabase...")
-    try:
-        success = supabase_client.save_detection(
-            image_path=str(output_path),
-            timestamp=timestamp,
-            confidence=person["confidence"],  # YOLO detection confidence
-            bounding_box=bbox,
-            costume_classification=classification,
-            costume_description=description,
-            costume_confidence=confidence,
+        # Dual-pass detection using shared detector, on the batched YOLO boxes
+        detected_people = detect_people_and_costumes(
+            img,
+            model,
+            baseten_client,
+            confidence_threshold=CONFIDENCE_THRESHOLD,
+            verbose=False,
+            detections=detections,
         )
 
-        if success:
-            print("✅ Successfully uploaded to Supabase!")
+        if not detected_people:
+            log("⚠️  No people or valid costumes detected")
+            return None
+
+        # Process first detection (for single-person test images)
+        person = detected_people[0]
+        bbox = person["bounding_box"]
+        log(f"📦 Using detection: {bbox}")
+
+        # Check if already classified (from inflatable validation)
+        if person.get("costume_classification"):
+            classification = person["costume_classification"]
+            confidence = person["costume_confidence"]
+            description = person["costume_description"]
+            log(f"✅ Costume already classified: {classification} ({confidence:.2f})")
         else:
-            print("❌ Failed to upload to Supabase")
+            # Extract person crop from ORIGINAL unblurred image for classification
+            person_crop = img[bbox["y1"]:bbox["y2"], bbox["x1"]:bbox["x2"]]
+
+            # Encode person crop to bytes (for Baseten), with the same settings
+            # the detector uses (no Huffman optimization, size-dependent quality)
+            image_bytes = encode_crop(person_crop)
+
+            log("\n🎭 Classifying costume with Baseten...")
+
+            # Classify costume
+            try:
+                (
+                    classification,
+                    confidence,
+                    description,
+                ) = baseten_client.classify_costume(image_bytes)
+
+                if classification:
+                    log("✅ Classification successful!")
+                    log(f"   Type:        {classification}")
+                    log(f"   Confidence:  {confidence:.2f}")
+                    log(f"   Description: {description}")
+                else:
+                    log("❌ Classification failed - no results returned")
+                    return None
+
+            except Exception as e:
+                log(f"❌ Baseten API error: {e}")
+                return None
 
-    except Exception as e:
-        print(f"❌ Supabase upload error: {e}")
+        # Generate timestamp for this detection (Pacific time)
+        timestamp = datetime.now(ZoneInfo("America/Los_Angeles"))
 
-    return {
-        "image_path": image_path,
-        "classification": classification,
-        "description": description,
-        "confidence": confidence,
-        "timestamp": timestamp,
-        "uploaded": success if 'success' in locals() else False,
-    }
+        # Save processed image locally
+        output_dir = Path("backend/tests/test_detections")
+        output_dir.mkdir(exist_ok=True)
+
+        # Include the fixture name: images processed concurrently can share a
+        # timestamp second and a classification
+        timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
+        output_filename = (
+            f"detection_{timestamp_str}_{Path(image_path).stem}_{classification}.jpg"
+        )
+        output_path = output_dir / output_filename
+
+        # Now blur the frame for privacy before saving
+        # (in place: the unblurred image is not needed after classification)
+        blurred_img = img
+        x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
+
+        # Extract person region
+        person_region = blurred_img[y1:y2, x1:x2]
+
+        # Pixelate (downsample 12x, upsample back) directly into the region,
+        # the same privacy blur the detector applies to captures
+        # This obscures facial features while keeping costume colors/shapes visible
+        if person_region.size > 0:
+            pixelate(person_region, 12, dst=person_region)
+            log("🔒 Blurred person for privacy")
+
+        # Draw bounding box on blurred image
+        cv2.rectangle(
+            blurred_img,
+            (x1, y1),
+            (x2, y2),
+            (0, 255, 0),
+            3
+        )
+
+        cv2.imwrite(str(output_path), blurred_img)
+        log(f"\n💾 Saved detection locally: {output_path}")
+
+        return {
+            "image_path": image_path,
+            "classification": classification,
+            "description": description,
+            "confidence": confidence,
+            "timestamp": timestamp,
+            # Supabase record, saved together with the other images' records
+            "detection": {
+                "image_path": str(output_path),
+                "timestamp": timestamp,
+                "confidence": person["confidence"],  # YOLO detection confidence
+                "bounding_box": bbox,
+                "costume_classification": classification,
+                "costume_description": description,
+                "costume_confidence": confidence,
+            },
+            "uploaded": False,
+        }
+    finally:
+        print("\n".join(lines))
 
 
 def main():
@@ -223,10 +250,12 @@ def main():
         print(f"❌ Failed to initialize Supabase client: {e}")
         sys.exit(1)
 
-    # Load YOLO model
+    # Load YOLO model with the same backend selection as the detector, and
+    # warm it up so the first test image doesn't pay the one-time init cost
     print("\n🤖 Loading YOLOv8n model...")
-    model = YOLO("yolov8n.pt")
-    print("✅ Model loaded!")
+    model = load_yolo_model()
+    warmup_model(model, batch=YOLO_BATCH_SIZE)
+    print(f"✅ Model loaded! (Backend: {model.backend})")
 
     # Find test images (all images in single/ folder for single-person detection)
     test_images_dir = Path("backend/tests/fixtures/single")
@@ -243,18 +272,80 @@ def main():
 
     print(f"\n📸 Found {len(test_images)} test images")
 
-    # Process each image
-    results = []
-    for i, image_path in enumerate(test_images, 1):
-        result = process_test_image(
-            str(image_path),
-            model,
-            baseten_client,
-            supabase_client,
-        )
+    # Process the images in batches: one YOLO call per batch on this thread,
+    # then each image's classification and blurring on a worker, so the
+    # network calls overlap each other and the next batch's YOLO call.
+    # Fixtures are decoded in parallel on a reader pool, one batch ahead
+    # (cv2.imread releases the GIL), so disk reads and JPEG decodes overlap
+    # YOLO instead of running serially before it
+    batches = [
+        test_images[batch_start:batch_start + YOLO_BATCH_SIZE]
+        for batch_start in range(0, len(test_images), YOLO_BATCH_SIZE)
+    ]
+    futures = []
+    with (
+        ThreadPoolExecutor(max_workers=PIPELINE_WORKERS) as executor,
+        ThreadPoolExecutor(
+            max_workers=YOLO_BATCH_SIZE, thread_name_prefix="imread"
+        ) as reader,
+    ):
+
+        def read_batch(batch: list[Path]) -> list:
+            return [reader.submit(cv2.imread, str(image_path)) for image_path in batch]
+
+        pending_reads = read_batch(batches[0])
+        for batch_index, batch in enumerate(batches):
+            reads = pending_reads
+            if batch_index + 1 < len(batches):
+                pending_reads = read_batch(batches[batch_index + 1])
+
+            batch_paths = []
+            batch_images = []
+            for image_path, read in zip(batch, reads, strict=True):
+                img = read.result()
+                if img is None:
+                    print(f"❌ Failed to read image: {image_path}")
+                    continue
+                batch_paths.append(image_path)
+                batch_images.append(img)
+
+            if not batch_images:
+                continue
+
+            print(f"\n🔍 Running YOLO on {len(batch_images)} image(s)...")
+            batch_detections = detect_boxes_batch(
+                model,
+                batch_images,
+                classes=DETECTION_CLASSES,
+                conf=CONFIDENCE_THRESHOLD,
+            )
 
-        if result:
-            results.append(result)
+            for image_path, img, detections in zip(
+                batch_paths, batch_images, batch_detections, strict=True
+            ):
+                futures.append(executor.submit(
+                    process_test_image,
+                    str(image_path),
+                    img,
+                    detections[detections[:, 4] > CONFIDENCE_THRESHOLD],
+                    model,
+                    baseten_client,
+                ))
+
+    # Collect results in fixture order
+    results = [result for result in (future.result() for future in futures) if result]
+
+    # Upload to Supabase: each image, then all records in batched inserts
+    if results:
+        print(f"\n📤 Uploading {len(results)} detection(s) to Supabase...")
+        try:
+            saved = supabase_client.save_detections_batch(
+                [result["detection"] for result in results]
+            )
+            for result, uploaded in zip(results, saved, strict=True):
+                result["uploaded"] = uploaded
+        except Exception as e:
+            print(f"❌ Supabase upload error: {e}")
 
     # Print summary
     print("\n" + "="*70)
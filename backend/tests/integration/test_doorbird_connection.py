@@ -9,6 +9,8 @@ import sys
 import cv2
 from dotenv import load_dotenv
 
+from backend.src.detection.rtsp_stream import build_rtsp_url, connect_to_stream
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -28,14 +30,14 @@ if not all([DOORBIRD_USER, DOORBIRD_PASSWORD, DOORBIRD_IP]):
     sys.exit(1)
 
 # Construct RTSP URL
-rtsp_url = f"rtsp://{DOORBIRD_USER}:{DOORBIRD_PASSWORD}@{DOORBIRD_IP}/mpeg/media.amp"
+rtsp_url = build_rtsp_url(DOORBIRD_USER, DOORBIRD_PASSWORD, DOORBIRD_IP)
 
 print("Testing DoorBird RTSP connection...")
 print(f"Connecting to: rtsp://{DOORBIRD_USER}:***@{DOORBIRD_IP}/mpeg/media.amp")
 print()
 
-# Try to open the RTSP stream
-cap = cv2.VideoCapture(rtsp_url)
+# Try to open the RTSP stream (same settings as the detector)
+cap = connect_to_stream(rtsp_url, os.getenv("RTSP_GST_DECODER"))
 
 if not cap.isOpened():
     print("❌ ERROR: Could not connect to DoorBird RTSP stream")
@@ -13,11 +13,16 @@ from zoneinfo import ZoneInfo
 
 import cv2
 from dotenv import load_dotenv
-from ultralytics import YOLO
 
 from backend.src.clients.baseten_client import BasetenClient
 from backend.src.clients.supabase_client import SupabaseClient
 from backend.src.costume_detector import detect_people_and_costumes
+from backend.src.detection.yolo_model import (
+    DetectorModel,
+    load_yolo_model,
+    warmup_model,
+)
+from backend.src.utils.face_blur import pixelate
 
 # Load environment variables
 load_dotenv()
@@ -25,7 +30,7 @@ load_dotenv()
 
 def process_nonhuman_costume_image(
     image_path: str,
-    model: YOLO,
+    model: DetectorModel,
     baseten_client: BasetenClient,
     supabase_client: SupabaseClient,
 ) -> list:
@@ -38,7 +43,7 @@ def process_nonhuman_costume_image(
 
     Args:
         image_path: Path to test image
-        model: YOLOv8 model
+        model: Model returned by load_yolo_model()
         baseten_client: Initialized Baseten client
         supabase_client: Initialized Supabase client
 
@@ -152,10 +157,10 @@ def process_nonhuman_costume_image(
         # Extract region
         region = blurred_frame[y1:y2, x1:x2]
 
-        # Apply moderate Gaussian blur (kernel size 33)
+        # Pixelate (downsample 12x, upsample back) directly into the region,
+        # the same privacy blur the detector applies to captures
         if region.size > 0:
-            blurred_region = cv2.GaussianBlur(region, (33, 33), 0)
-            blurred_frame[y1:y2, x1:x2] = blurred_region
+            pixelate(region, 12, dst=region)
 
     # Draw bounding boxes on the blurred frame
     for idx, detection in enumerate(all_detections, start=1):
@@ -246,9 +251,12 @@ def main():
             supabase_client = None
 
     # Load YOLO model
+    # (TensorRT FP16 engine on NVIDIA GPUs, exported on first use; same
+    # backend selection as the detector), warmed up before the first image
     print("\n🤖 Loading YOLOv8n model...")
-    model = YOLO("yolov8n.pt")
-    print("✅ Model loaded!")
+    model = load_yolo_model()
+    warmup_model(model)
+    print(f"✅ Model loaded! (Backend: {model.backend})")
 
     # Find test images (all images in nonhuman/ folder)
     test_images_dir = Path("backend/tests/fixtures/nonhuman")